@@ -0,0 +1,233 @@
+"""
+AracımSağlam - Assistant pipeline
+
+The steps of /api/assistant that don't depend on how the LLM is called,
+shared by the Flask view (run_app.py) and the async app (asgi_app.py):
+search, prompt building and the local rule based reply.
+
+With a session (sessions.py) a message continues the conversation: its
+criteria are merged into the previous ones, "daha ucuz / daha yeni /
+daha az km" tighten them relative to the top car shown last, and when
+the result can only shrink it is filtered from the previous result
+instead of the whole catalog. If nothing beats that car (it already was
+the cheapest, newest...) the previous search is shown again and the
+reply says so.
+"""
+from array import array
+
+from car_catalog import parse_intent, filter_indexes, sort_indexes
+from metrics import span
+import pricing
+
+# Number of cars shown to the user and given to the LLM
+MAX_MATCHES = 6
+# Previous results larger than this are not kept; follow-ups then rescan the catalog
+SESSION_MAX_RESULTS = 1000
+# Recent user messages kept for the LLM prompt
+HISTORY_MESSAGES = 4
+
+LIST_KEYS = ('brands', 'cities', 'fuels', 'transmissions')
+MIN_KEYS = ('budget_min', 'year_min')
+MAX_KEYS = ('budget_max', 'year_max', 'km_max')
+
+RESET_WORDS = ('yeni arama', 'baştan', 'sıfırla', 'boşver')
+CHEAPER_WORDS = ('daha ucuz', 'daha uygun', 'daha düşük fiyat')
+NEWER_WORDS = ('daha yeni', 'daha güncel')
+LOWER_KM_WORDS = ('daha az km', 'daha düşük km', 'daha az kilometre', 'daha düşük kilometre')
+
+# Refinements nothing could satisfy, in reply order
+UNMET_REPLIES = {
+    'cheaper': "💡 Daha ucuzu yok: gösterdiğim ilk araç zaten bu kriterlere uyan en ucuz seçenek.",
+    'newer': "💡 Daha yenisi yok: gösterdiğim ilk araç zaten bu kriterlere uyan en yeni seçenek.",
+    'lower_km': "💡 Daha az kilometrelisi yok: gösterdiğim ilk araç zaten bu kriterlere uyan en düşük kilometreli seçenek.",
+}
+
+EMPTY_SYSTEM_PROMPT = "Sen Türkçe konuşan yardımsever bir otomobil asistanısın. Kullanıcıya kriterlerine uygun araç bulunamadığını nazikçe söyle ve kriterlerini (şehir, bütçe vb) değiştirmesini öner."
+
+SYSTEM_PROMPT = """Sen Türkiye ikinci el araç piyasasında uzmanlaşmış, profesyonel bir otomobil danışmanısın.
+Görev: Kullanıcıyı sadece listemek değil, DOĞRU satın alma kararına yönlendirmek.
+Dinamikleri anlıyorsun: Fiyat/performans, segment beklentileri, yakıt/vites tercihleri, aile/genç kullanımı.
+
+KURALLAR:
+1. Sana filtrelenmiş bir araç listesi verilecek. ASLA bu liste dışında araç uydurma.
+2. Her aracın NEDEN uygun olduğunu veya olmadığını gerekçeleriyle açıkla.
+3. Eksi yönleri nazikçe ve şeffafça belirt.
+4. "En ucuz", "en az yakan" gibi fırsatları vurgula.
+5. Dil: Türkçe. Ton: Profesyonel, güven verici, satış odaklı ama asla agresif değil. Gerçek bir danışman gibi konuş."""
+
+
+def merge_criteria(previous, current):
+    """Criteria of a follow-up: what the new message sets wins, the rest is kept"""
+    merged = dict(previous)
+    merged.pop('unmet', None)
+    for key, value in current.items():
+        if key == 'sort':
+            if value != 'default':
+                merged[key] = value
+        elif value:
+            merged[key] = value
+    return merged
+
+def narrows(previous, criteria):
+    """True if every car matching criteria also matched previous"""
+    for key in LIST_KEYS:
+        if previous.get(key) and not set(criteria[key]) <= set(previous[key]):
+            return False
+    for key in MIN_KEYS:
+        if previous.get(key) and (criteria[key] or 0) < previous[key]:
+            return False
+    for key in MAX_KEYS:
+        if previous.get(key) and not (criteria[key] and criteria[key] <= previous[key]):
+            return False
+    return True
+
+def refine(criteria, user_msg, top):
+    """(criteria, applied) for 'daha ucuz / daha yeni / daha az km' relative to the top car shown last (a row)"""
+    criteria = dict(criteria)
+    applied = []
+    if any(w in user_msg for w in CHEAPER_WORDS) and top['price']:
+        criteria['budget_max'] = min(criteria['budget_max'] or top['price'], top['price'] - 1)
+        criteria['sort'] = 'price_asc'
+        applied.append('cheaper')
+    if any(w in user_msg for w in NEWER_WORDS) and top['year']:
+        criteria['year_min'] = max(criteria['year_min'] or 0, top['year'] + 1)
+        applied.append('newer')
+    if any(w in user_msg for w in LOWER_KM_WORDS) and top['km']:
+        criteria['km_max'] = min(criteria['km_max'] or top['km'], top['km'] - 1)
+        criteria['sort'] = 'km_asc'
+        applied.append('lower_km')
+    return criteria, applied
+
+def find_matches(snapshot, user_msg, route='assistant', previous=None):
+    """(criteria, filtered positions, top matches) for an already turkish_lower'ed message
+
+    previous is the session state of the conversation (see session_state).
+    When a refinement matches nothing, criteria['unmet'] lists it and the
+    results are those of the criteria without it.
+    """
+    candidates = None
+    base, applied = None, []
+    # --- 1. Robust Intent Parsing ---
+    with span(route, 'parse'):
+        criteria = parse_intent(user_msg, snapshot)
+        if previous and not any(w in user_msg for w in RESET_WORDS):
+            # Positions are only valid for the catalog version they came from
+            same_version = previous.get('etag') == snapshot.etag
+            criteria = merge_criteria(previous['criteria'], criteria)
+            if same_version and previous['shown']:
+                base = criteria
+                criteria, applied = refine(base, user_msg, snapshot.rows[previous['shown'][0]])
+                if previous['results'] is not None and narrows(previous['criteria'], criteria):
+                    candidates = previous['results']
+
+    # --- 2. Filtering Logic ---
+    # If city is specified, DO NOT return cars from other cities
+    with span(route, 'filter'):
+        filtered = filter_indexes(snapshot, criteria, candidates)
+        if applied and not filtered:
+            # Nothing beats the top car: show the search without the refinement
+            criteria = dict(base, unmet=applied)
+            if candidates is not None and not narrows(previous['criteria'], base):
+                candidates = None
+            filtered = filter_indexes(snapshot, criteria, candidates)
+
+    # --- 3. Sorting/Ranking ---
+    with span(route, 'sort'):
+        scores = pricing.score_catalog(snapshot) if criteria['sort'] == 'best' else None
+        sort_indexes(snapshot, filtered, criteria['sort'], scores.sort_score if scores else None)
+
+    # Top results
+    matches = [snapshot.cars[i] for i in filtered[:MAX_MATCHES]]
+    return criteria, filtered, matches
+
+def session_state(snapshot, user_msg, criteria, filtered, previous=None):
+    """What the session keeps after this message (JSON-able, see sessions.py)"""
+    history = (previous or {}).get('history', [])[-(HISTORY_MESSAGES - 1):] + [user_msg]
+    if previous and not filtered:
+        # A follow-up that found nothing doesn't replace the last good search
+        return dict(previous, history=history)
+    return {
+        'etag': snapshot.etag,
+        'criteria': criteria,
+        # Sorted positions of the whole result, None when too large to keep
+        'results': array('I', sorted(filtered)) if len(filtered) <= SESSION_MAX_RESULTS else None,
+        'shown': filtered[:MAX_MATCHES],
+        'history': history,
+    }
+
+def build_messages(user_msg, matches, previous=None, criteria=None):
+    """Chat messages (system + user) asking the LLM to present the matches"""
+    history = (previous or {}).get('history')
+    history_str = ""
+    if history:
+        history_str = "Önceki mesajlar: " + " / ".join(f"'{m}'" for m in history) + "\n"
+    for name in (criteria or {}).get('unmet', []):
+        history_str += f"Not (kullanıcıya belirt): {UNMET_REPLIES[name].split(' ', 1)[1]}\n"
+
+    if not matches:
+        system_prompt = EMPTY_SYSTEM_PROMPT
+        user_content = f"{history_str}Kullanıcı mesajı: '{user_msg}'. Hiç araç bulunamadı."
+    else:
+        system_prompt = SYSTEM_PROMPT
+
+        # Compact car list
+        car_context = []
+        for m in matches:
+            car_context.append(f"- {m['title']} ({m['year']}), {m['price']}, {m['km']} km, {m['city']}, {m['fuel']}, {m['transmission']}")
+
+        car_list_str = "\n".join(car_context)
+        user_content = f"""{history_str}Kullanıcı Mesajı: '{user_msg}'
+
+Bulunan Araçlar (Sadece bunlardan seç):
+{car_list_str}
+
+Lütfen şu formatta yanıt ver:
+1. İsteği Özetle: (Kullanıcı ne arıyor? Bütçe, şehir vb.)
+2. En İyi 3-5 Seçenek:
+   - [Araç Adı]: Kimin için uygun? Güçlü yönü ne? (Fiyat, Yakıt, Konfor vb.)
+3. Karşılaştırma: (Varsa benzer araçları kıyasla)
+4. Şehir ve Uygunluk: (Şehir dışı ise belirt)
+5. Tavsiye: Güven verici bir kapanış cümlesi.
+"""
+
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content}
+    ]
+
+def completion_prompt(messages):
+    """Single prompt for completion style APIs (Ollama /api/generate)"""
+    return "\n\n".join(m['content'] for m in messages)
+
+def local_reply(criteria, filtered, matches):
+    """Rule based reply used when no LLM answer is available"""
+    reply_parts = []
+
+    if not matches:
+        reply_parts.append("😔 Maalesef belirttiğiniz kriterlere uygun araç bulamadım.")
+        reply_parts.append("Kriterlerinizi (bütçe, yıl vb.) biraz esnetmeyi deneyebilirsiniz.")
+        return "\n".join(reply_parts)
+
+    count = len(filtered)
+    shown = len(matches)
+
+    for name in criteria.get('unmet', []):
+        reply_parts.append(UNMET_REPLIES[name])
+
+    summary_adjs = []
+    if criteria['brands']: summary_adjs.append(f"{','.join(criteria['brands']).upper()}")
+    if criteria['year_min']: summary_adjs.append(f"{criteria['year_min']}+ model")
+    if criteria['budget_max']: summary_adjs.append(f"{criteria['budget_max']/1000:.0f}k TL altı")
+
+    desc = " ".join(summary_adjs)
+    if not desc: desc = "uygun"
+
+    reply_parts.append(f"🔍 Aradığınız kriterlere {desc} toplam {count} araç buldum.")
+    reply_parts.append(f"İşte en iyi {shown} tanesi:")
+
+    bullet_list = []
+    for m in matches:
+        bullet_list.append(f"• {m.get('title')} ({m.get('price')})")
+
+    reply_parts.append("\n".join(bullet_list))
+    return "\n\n".join(reply_parts)
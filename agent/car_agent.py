@@ -1,23 +1,22 @@
-import json
 import os
 import requests
+from car_catalog import get_catalog
+import metrics
 
 class CarAgent:
     def __init__(self, use_ollama=True):
         self.use_ollama = use_ollama
         self.ollama_url = os.environ.get('OLLAMA_URL', "http://localhost:11434/api/generate")
-        self.cars_data = self.load_cars()
+        self.catalog = get_catalog()
+        
+    @property
+    def cars_data(self):
+        """Paylaşılan katalogdaki güncel araba verileri"""
+        return self.catalog.cars
         
     def load_cars(self):
         """Çekilen araba verilerini yükler"""
-        try:
-            # Use absolute path relative to this file
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            cars_path = os.path.join(base_dir, 'data', 'cars.json')
-            with open(cars_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return []
+        return self.catalog.cars
     
     def search_cars(self, query):
         """Kullanıcı sorgusuna göre araba önerir"""
@@ -47,14 +46,14 @@ Müşteriye en uygun arabaları öner ve detaylı açıklama yap. Fiyat, kilomet
                 f"{i}. {car['title']}\n"
                 f"   Fiyat: {car['price']}\n"
                 f"   Yıl: {car['year']}, KM: {car['km']}\n"
-                f"   Konum: {car['location']}\n"
+                f"   Konum: {car.get('location') or car.get('city', '')}\n"
             )
         
         return "\n".join(context)
     
     def analyze_car(self, car_id):
         """Belirli bir arabayı detaylı analiz eder"""
-        car = next((c for c in self.cars_data if c['id'] == car_id), None)
+        car = self.catalog.snapshot().get(car_id)
         
         if not car:
             return "Araba bulunamadı."
@@ -65,7 +64,7 @@ Başlık: {car['title']}
 Fiyat: {car['price']}
 Yıl: {car['year']}
 Kilometre: {car['km']}
-Konum: {car['location']}
+Konum: {car.get('location') or car.get('city', '')}
 
 Arabanın artıları, eksileri ve fiyat değerlendirmesi yap."""
 
@@ -78,7 +77,7 @@ Arabanın artıları, eksileri ve fiyat değerlendirmesi yap."""
 💰 Fiyat: {car['price']}
 📅 Yıl: {car['year']}
 🛣️ Kilometre: {car['km']}
-📍 Konum: {car['location']}
+📍 Konum: {car.get('location') or car.get('city', '')}
 
 Bu araç için basit analiz. Daha detaylı analiz için Ollama kurabilirsiniz.
 """
@@ -86,18 +85,24 @@ Bu araç için basit analiz. Daha detaylı analiz için Ollama kurabilirsiniz.
     def _call_ollama(self, prompt):
         """Ollama API'sine istek gönderir"""
         try:
-            response = requests.post(
-                self.ollama_url,
-                json={
-                    "model": "llama3.2",
-                    "prompt": prompt,
-                    "stream": False
-                },
-                timeout=30
-            )
+            with metrics.time_llm('agent', 'ollama'):
+                response = requests.post(
+                    self.ollama_url,
+                    json={
+                        "model": "llama3.2",
+                        "prompt": prompt,
+                        "stream": False
+                    },
+                    timeout=30
+                )
             
             if response.status_code == 200:
-                return response.json().get('response', 'Yanıt alınamadı')
+                data = response.json()
+                metrics.record_llm_usage('agent', 'ollama', {
+                    'prompt_tokens': data.get('prompt_eval_count'),
+                    'completion_tokens': data.get('eval_count'),
+                })
+                return data.get('response', 'Yanıt alınamadı')
             else:
                 return self._simple_search(prompt)
         except:
@@ -108,19 +113,21 @@ Bu araç için basit analiz. Daha detaylı analiz için Ollama kurabilirsiniz.
         query_lower = query.lower()
         results = []
         
-        # Fiyat filtresi
+        # Fiyat filtresi (katalogdaki hazır fiyat alanları kullanılır)
+        snapshot = self.catalog.snapshot()
+        by_price = lambda i: snapshot.rows[i]['price']
         if 'ucuz' in query_lower or 'düşük' in query_lower:
-            results = sorted(self.cars_data, key=lambda x: self._extract_price(x['price']))[:5]
+            results = [snapshot.cars[i] for i in sorted(range(len(snapshot.cars)), key=by_price)[:5]]
         elif 'pahalı' in query_lower or 'yüksek' in query_lower:
-            results = sorted(self.cars_data, key=lambda x: self._extract_price(x['price']), reverse=True)[:5]
+            results = [snapshot.cars[i] for i in sorted(range(len(snapshot.cars)), key=by_price, reverse=True)[:5]]
         else:
-            results = self.cars_data[:5]
+            results = snapshot.cars[:5]
         
         response = "🚗 Size uygun arabalar:\n\n"
         for i, car in enumerate(results, 1):
             response += f"{i}. {car['title']}\n"
             response += f"   💰 {car['price']} | 📅 {car['year']} | 🛣️ {car['km']}\n"
-            response += f"   📍 {car['location']}\n\n"
+            response += f"   📍 {car.get('location') or car.get('city', '')}\n\n"
         
         return response
     
@@ -0,0 +1,395 @@
+"""
+AracımSağlam - Shared catalog & search service
+
+Both web entry points (run_app.py, website/app.py) and CarAgent read the
+car data through this module, so one process keeps a single parsed copy of
+cars.json together with its indexes and per-version caches.
+"""
+import json
+import os
+import re
+import tempfile
+import time
+from threading import Lock, Thread
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CARS_PATH = os.path.join(BASE_DIR, 'data', 'cars.json')
+
+
+# Helper Functions
+def turkish_lower(text):
+    """Robust lowercase for Turkish characters I/İ"""
+    if not text: return ""
+    # Map specifically problematic characters first
+    text = text.replace('İ', 'i').replace('I', 'ı')
+    return text.lower()
+
+def clean_price(price_str):
+    if not price_str: return 0
+    # Remove TL, space, dots
+    clean = str(price_str).replace('TL', '').replace('.', '').replace(',', '').strip()
+    try:
+        return int(clean)
+    except:
+        return 0
+
+def clean_km(km_str):
+    if not km_str: return 0
+    clean = str(km_str).replace('.', '').replace(',', '').strip()
+    try:
+        return int(clean)
+    except:
+        return 0
+
+def clean_year(year_str):
+    try:
+        return int(year_str or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class CatalogSnapshot:
+    """One parsed version of cars.json with its indexes"""
+
+    def __init__(self, cars, version, stamp):
+        self.cars = cars
+        self.version = version
+        self.stamp = stamp
+        # Identifies the file contents across processes (HTTP ETags)
+        self.etag = f'{stamp[0]:x}-{stamp[1]:x}' if stamp else '0'
+
+        # Normalized fields, aligned with self.cars by position
+        self.rows = [
+            {
+                'brand': turkish_lower(c.get('brand', '')),
+                'city': turkish_lower(c.get('city', '')),
+                'fuel': turkish_lower(c.get('fuel', '')),
+                'transmission': turkish_lower(c.get('transmission', '')),
+                'year': clean_year(c.get('year')),
+                'price': clean_price(c.get('price')),
+                'km': clean_km(c.get('km')),
+            }
+            for c in cars
+        ]
+        self.by_id = {c.get('id'): i for i, c in enumerate(cars)}
+        self.brands = set(c.get('brand', '').lower() for c in cars)
+        self.cities = set(r['city'] for r in self.rows)
+
+        self._memo = {}
+        self._memo_lock = Lock()
+
+    def get(self, car_id):
+        """Returns the car with the given id, or None"""
+        idx = self.by_id.get(car_id)
+        return self.cars[idx] if idx is not None else None
+
+    def peek(self, key):
+        """Cached value for key, or None if memo() has not computed it yet"""
+        return self._memo.get(key)
+
+    def memo(self, key, factory):
+        """Caches factory() for the lifetime of this catalog version"""
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        with self._memo_lock:
+            if key not in self._memo:
+                self._memo[key] = factory()
+            return self._memo[key]
+
+
+class CarCatalog:
+    """Loads cars.json and swaps in a new snapshot when the file changes"""
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get('CARS_PATH') or DEFAULT_CARS_PATH
+        # When False the loaded snapshot is kept until refresh() is called
+        # (e.g. gunicorn workers that inherit a preloaded catalog)
+        self.auto_reload = True
+        self.reload_count = 0
+        self._lock = Lock()
+        self._snapshot = None
+        self._watcher = None
+        # Called with each newly loaded snapshot to build derived caches
+        self.listeners = []
+
+    def _stamp(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+
+    def snapshot(self):
+        """Current catalog version, reloaded only if cars.json changed on disk"""
+        snap = self._snapshot
+        if snap is not None and not self.auto_reload:
+            return snap
+        return self.refresh()
+
+    def refresh(self):
+        """Re-parses cars.json if it changed since the last load"""
+        stamp = self._stamp()
+        snap = self._snapshot
+        if snap is not None and snap.stamp == stamp:
+            return snap
+        with self._lock:
+            snap = self._snapshot
+            if snap is not None and snap.stamp == stamp:
+                return snap
+            version = snap.version + 1 if snap else 1
+            snap = CatalogSnapshot(self._load(), version, stamp)
+            # Derived data is ready before other threads can see this version
+            for listener in self.listeners:
+                try:
+                    listener(snap)
+                except Exception as e:
+                    print(f"Catalog listener error: {e}")
+            self._snapshot = snap
+            self.reload_count += 1
+            return snap
+
+    def start_watcher(self, interval=2.0):
+        """Polls cars.json in a background thread and swaps in new versions.
+
+        Requests then always read the already-parsed snapshot and never parse
+        the file themselves.
+        """
+        if self._watcher is not None:
+            return
+        self.refresh()
+        self.auto_reload = False
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Catalog watcher error: {e}")
+
+        self._watcher = Thread(target=run, name='catalog-watcher', daemon=True)
+        self._watcher.start()
+
+    def current(self):
+        """Last loaded snapshot without checking the file (None before first load)"""
+        return self._snapshot
+
+    @property
+    def cars(self):
+        return self.snapshot().cars
+
+
+def write_snapshot(cars, path=None):
+    """Atomically replaces cars.json: readers see either the old or the new file.
+
+    The rename changes the file's mtime, which is what running catalogs
+    (and the gunicorn master) watch for.
+    """
+    path = path or os.environ.get('CARS_PATH') or DEFAULT_CARS_PATH
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.cars-', suffix='.json.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(cars, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+_catalog = None
+_catalog_lock = Lock()
+
+def get_catalog(path=None):
+    """Process-wide shared catalog. The first caller may choose the file path."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = CarCatalog(path)
+    return _catalog
+
+
+# --- Search ---
+
+CITY_SUFFIXES = ['', 'da', 'de', 'ta', 'te', 'dan', 'den', 'tan', 'ten', 'daki', 'deki']
+
+FUEL_MAP = {
+    'benzin': ['benzin'],
+    'dizel': ['dizel'],
+    'motorin': ['dizel'], # alias
+    'hibrit': ['hybrid', 'hibrit'],
+    'elektrik': ['elektrik'],
+    'lpg': ['lpg']
+}
+
+AUTOMATIC_TRANSMISSIONS = ['otomatik', 'yarı otomatik', 'dct', 'cvt', 'pdk', 'dsg', 'triptonik']
+
+def parse_money_token(token):
+    token = token.replace(',', '.')
+    mult = 1
+    if 'm' in token or 'milyon' in token: mult = 1000000
+    elif 'k' in token or 'bin' in token: mult = 1000
+    # clean nums
+    nums = re.findall(r'\d+(?:[.]\d+)?', token)
+    if not nums: return None
+    val = float(nums[0])
+    # "500k" -> 500 * 1000
+    return int(val * mult)
+
+def parse_intent(user_msg, snapshot):
+    """Extracts search criteria from an already turkish_lower'ed message"""
+    criteria = {
+        'budget_max': None,
+        'budget_min': None,
+        'brands': [],
+        'cities': [],
+        'fuels': [],
+        'year_min': None,
+        'year_max': None,
+        'transmissions': [],
+        'km_max': None,
+        'sort': 'default' # default, price_asc, km_asc, best
+    }
+
+    # A. Brands (Exact match from dataset)
+    for b in snapshot.brands:
+        # Check strict word match to avoid partials inside other words
+        if b and re.search(r'\b' + re.escape(b) + r'\b', user_msg):
+            criteria['brands'].append(b)
+
+    # B. Cities (Suffix handling: istanbulda -> istanbul)
+    words = [re.sub(r'[^\w\s]', '', word) for word in user_msg.split()]
+    for city in snapshot.cities:
+        if not city:
+            continue
+        for clean_word in words:
+            if clean_word.startswith(city) and clean_word[len(city):] in CITY_SUFFIXES:
+                criteria['cities'].append(city)
+                break
+
+    # C. Fuel
+    for key, values in FUEL_MAP.items():
+        if key in user_msg:
+            criteria['fuels'].extend(values)
+
+    # D. Transmission
+    if 'otomatik' in user_msg:
+        criteria['transmissions'].extend(AUTOMATIC_TRANSMISSIONS)
+    if 'manuel' in user_msg:
+        criteria['transmissions'].append('manuel')
+
+    # E. Year
+    # "2018 ve üstü", "2018 üzeri"
+    year_min_match = re.search(r'(\d{4})\s*(ve\s*)?(üstü|üzeri|sonrası)', user_msg)
+    if year_min_match:
+        criteria['year_min'] = int(year_min_match.group(1))
+
+    # Range: "2015-2020", "2015 ile 2020"
+    year_range_match = re.search(r'(\d{4})\s*[-ile]\s*(\d{4})', user_msg)
+    if year_range_match:
+        y1, y2 = int(year_range_match.group(1)), int(year_range_match.group(2))
+        criteria['year_min'] = min(y1, y2)
+        criteria['year_max'] = max(y1, y2)
+
+    # F. Budget
+    # Max budget: "2m altı", "500.000 tl altı"
+    max_budget_match = re.search(r'(\d+(?:[.,]\d+)?\s*(?:m|k|bin|milyon|tl)?)\s*(?:altı|altında)', user_msg)
+    if max_budget_match:
+        val = parse_money_token(max_budget_match.group(1))
+        if val and val > 1000: criteria['budget_max'] = val
+
+    # Range budget: "500 - 1000 arası", "500k - 1m"
+    money_tokens = re.findall(r'\d+(?:[.,]\d+)?\s*(?:m|k|bin|milyon|tl)?', user_msg)
+    if len(money_tokens) >= 2 and ('arası' in user_msg or '-' in user_msg):
+        v1 = parse_money_token(money_tokens[0])
+        v2 = parse_money_token(money_tokens[1])
+        if v1 and v2 and v1 > 1000 and v2 > 1000:
+            criteria['budget_min'] = min(v1, v2)
+            criteria['budget_max'] = max(v1, v2)
+
+    # Sorting intent
+    if 'en ucuz' in user_msg or 'fiyatı düşük' in user_msg: criteria['sort'] = 'price_asc'
+    elif 'en az km' in user_msg or 'kilometresi düşük' in user_msg: criteria['sort'] = 'km_asc'
+    elif 'en iyi' in user_msg or 'öner' in user_msg: criteria['sort'] = 'best'
+
+    return criteria
+
+def filter_indexes(snapshot, criteria, candidates=None):
+    """Positions of the cars matching criteria; optionally only among candidates"""
+    brands = criteria['brands']
+    cities = criteria['cities']
+    fuels = criteria['fuels']
+    transmissions = criteria['transmissions']
+    year_min, year_max = criteria['year_min'], criteria['year_max']
+    budget_min, budget_max = criteria['budget_min'], criteria['budget_max']
+    km_max = criteria.get('km_max')
+
+    rows = snapshot.rows
+    if candidates is None:
+        candidates = range(len(rows))
+
+    result = []
+    for i in candidates:
+        r = rows[i]
+        # Strict Checks
+        if brands and r['brand'] not in brands: continue
+        if cities and r['city'] not in cities: continue
+        if fuels and not any(f in r['fuel'] for f in fuels): continue
+        if transmissions and not any(t in r['transmission'] for t in transmissions): continue
+
+        if year_min and r['year'] < year_min: continue
+        if year_max and r['year'] > year_max: continue
+
+        if budget_max and r['price'] > budget_max: continue
+        if budget_min and r['price'] < budget_min: continue
+        if km_max and r['km'] > km_max: continue
+
+        result.append(i)
+    return result
+
+def sort_indexes(snapshot, indexes, sort, deal_scores=None):
+    """Sorts car positions in place for the requested ordering.
+
+    deal_scores (aligned with snapshot.cars) ranks 'best' by value for money;
+    without it a year/price/km heuristic is used.
+    """
+    rows = snapshot.rows
+
+    def get_sort_key(i):
+        r = rows[i]
+        p, k, y = r['price'], r['km'], r['year']
+
+        if sort == 'price_asc': return (p, k)
+        if sort == 'km_asc': return (k, p)
+        if sort == 'best':
+            if deal_scores is not None:
+                return (-deal_scores[i], p)
+            # Weighted score: low price, low km, high year (heuristic)
+            return (-((y * 5000) - (p / 200) - (k / 10)),)
+
+        # Default: just budget compliance (already filtered) then price
+        return (p, k)
+
+    indexes.sort(key=get_sort_key)
+    return indexes
+
+def search(snapshot, criteria, candidates=None, deal_scores=None):
+    """Filtered and sorted car positions for criteria"""
+    return sort_indexes(snapshot, filter_indexes(snapshot, criteria, candidates), criteria['sort'], deal_scores)
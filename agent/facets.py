@@ -0,0 +1,144 @@
+"""
+AracımSağlam - Facet counts for the filter UI
+
+For each catalog version one bitmap is built per facet value (brand, city,
+fuel, transmission, year bucket, price bucket): a Python int whose bit i
+is set when snapshot.cars[i] has that value. A facet query then is a few
+ANDs/ORs over those ints plus a popcount per value, which stays in the
+low milliseconds even for very large catalogs.
+
+Counts are disjunctive: the counts of a facet apply every selected filter
+except the facet's own, so the UI can show how many results picking
+another value would add.
+"""
+from car_catalog import turkish_lower
+
+try:
+    popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def popcount(bits):
+        return bin(bits).count('1')
+
+YEAR_BUCKETS = [
+    (None, 2014, '2014 ve öncesi'),
+    (2015, 2017, '2015 - 2017'),
+    (2018, 2020, '2018 - 2020'),
+    (2021, 2022, '2021 - 2022'),
+    (2023, None, '2023 ve sonrası'),
+]
+
+PRICE_BUCKETS = [
+    (None, 500000, '500 bin TL altı'),
+    (500000, 1000000, '500 bin - 1 milyon TL'),
+    (1000000, 1500000, '1 - 1,5 milyon TL'),
+    (1500000, 2000000, '1,5 - 2 milyon TL'),
+    (2000000, 3000000, '2 - 3 milyon TL'),
+    (3000000, 5000000, '3 - 5 milyon TL'),
+    (5000000, None, '5 milyon TL ve üzeri'),
+]
+
+# Facet name -> car field for the categorical facets
+FIELDS = {'brand': 'brand', 'city': 'city', 'fuel': 'fuel', 'transmission': 'transmission'}
+FACETS = ('brand', 'city', 'fuel', 'transmission', 'year', 'price')
+
+
+def bucket_key(lo, hi):
+    """'2015-2017', '-2014', '2023-' ... used as the filter value of a bucket"""
+    return f"{'' if lo is None else lo}-{'' if hi is None else hi}"
+
+def _bucket_of(value, buckets, upper_inclusive):
+    for lo, hi, _ in buckets:
+        if lo is not None and value < lo:
+            continue
+        if hi is not None and (value > hi if upper_inclusive else value >= hi):
+            continue
+        return bucket_key(lo, hi)
+    return None
+
+def _to_bitmap(positions, size):
+    bits = bytearray((size + 7) // 8)
+    for i in positions:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, 'little')
+
+
+class FacetIndex:
+    """Bitmaps of one catalog snapshot: facet -> {value key: bitmap}, plus labels"""
+
+    def __init__(self, snapshot):
+        self.size = len(snapshot.cars)
+        self.all = (1 << self.size) - 1
+        self.bitmaps = {}
+        self.labels = {}
+
+        positions = {name: {} for name in FACETS}
+        labels = {name: {} for name in FACETS}
+        for i, (car, row) in enumerate(zip(snapshot.cars, snapshot.rows)):
+            for name, field in FIELDS.items():
+                key = row[field]
+                if key:
+                    positions[name].setdefault(key, []).append(i)
+                    if key not in labels[name]:
+                        labels[name][key] = str(car.get(field, '')).strip()
+            if row['year']:
+                positions['year'].setdefault(_bucket_of(row['year'], YEAR_BUCKETS, True), []).append(i)
+            if row['price']:
+                positions['price'].setdefault(_bucket_of(row['price'], PRICE_BUCKETS, False), []).append(i)
+
+        for name in FACETS:
+            self.bitmaps[name] = {key: _to_bitmap(pos, self.size) for key, pos in positions[name].items()}
+        self.labels = labels
+        self.labels['year'] = {bucket_key(lo, hi): label for lo, hi, label in YEAR_BUCKETS}
+        self.labels['price'] = {bucket_key(lo, hi): label for lo, hi, label in PRICE_BUCKETS}
+
+    def _key(self, name, value):
+        return turkish_lower(value.strip()) if name in FIELDS else value.strip()
+
+    def mask(self, name, values):
+        """OR of the selected values of one facet (all cars if nothing is selected)"""
+        if not values:
+            return self.all
+        bitmaps = self.bitmaps[name]
+        bits = 0
+        for value in values:
+            bits |= bitmaps.get(self._key(name, value), 0)
+        return bits
+
+    def counts(self, filters):
+        """(matched, {facet: [{value, label, count, selected}]}) for filters {facet: [values]}"""
+        masks = {name: self.mask(name, filters.get(name)) for name in FACETS}
+
+        matched = self.all
+        for bits in masks.values():
+            matched &= bits
+
+        result = {}
+        for name in FACETS:
+            # Every filter except this facet's own
+            others = self.all
+            for other, bits in masks.items():
+                if other != name:
+                    others &= bits
+
+            selected = {self._key(name, v) for v in filters.get(name) or ()}
+            items = []
+            for key, bits in self.bitmaps[name].items():
+                count = popcount(bits & others)
+                if count or key in selected:
+                    items.append({'value': key if name in ('year', 'price') else self.labels[name][key],
+                                  'label': self.labels[name][key],
+                                  'count': count,
+                                  'selected': key in selected})
+
+            if name in ('year', 'price'):
+                order = list(self.labels[name])
+                items.sort(key=lambda item: order.index(item['value']))
+            else:
+                items.sort(key=lambda item: (-item['count'], turkish_lower(item['label'])))
+            result[name] = items
+        return popcount(matched), result
+
+
+def get_index(snapshot):
+    """FacetIndex of this catalog version (built once)"""
+    return snapshot.memo('facets', lambda: FacetIndex(snapshot))
@@ -0,0 +1,261 @@
+"""
+AracımSağlam - Listing photo thumbnails
+
+Fetches each remote listing image once, stores a resized WebP/JPEG
+thumbnail on disk and evicts the least recently used files when the
+directory grows past its size limit. Pillow is optional and imported on
+the first miss: without it the original image bytes are cached as-is.
+
+Only images are cached and served: downloads are capped at
+MAX_DOWNLOAD_BYTES, anything that isn't a recognised image format is
+rejected, and failed URLs are remembered for FAILURE_TTL seconds so a
+dead or slow image host isn't retried on every page view.
+
+The fetcher is pluggable (any callable url -> bytes) so the cache can be
+exercised with a local stub instead of the network.
+"""
+import hashlib
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from threading import Lock
+
+THUMB_SIZE = (400, 300)
+MAX_DOWNLOAD_BYTES = 10 * 1024 * 1024
+FAILURE_TTL = 5 * 60
+MAX_FAILURES = 10000
+
+
+class ImageUnavailable(Exception):
+    """The URL failed recently or doesn't point to an image"""
+
+
+def requests_fetcher(url, timeout=10, max_bytes=MAX_DOWNLOAD_BYTES):
+    """Default fetcher: downloads url with requests and returns the body (at most max_bytes)"""
+    import requests
+    with requests.get(url, timeout=timeout, stream=True,
+                      headers={'User-Agent': 'AracimSaglam-ImageProxy/1.0'}) as response:
+        response.raise_for_status()
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit() and int(length) > max_bytes:
+            raise ImageUnavailable(f"image too large ({length} bytes)")
+        body = bytearray()
+        for chunk in response.iter_content(64 * 1024):
+            body += chunk
+            if len(body) > max_bytes:
+                raise ImageUnavailable(f"image larger than {max_bytes} bytes")
+    return bytes(body)
+
+def load_pil():
+    """PIL.Image, imported on first use (slow import), or None if Pillow isn't installed"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+def sniff_mimetype(data):
+    """Guesses the image type from the first bytes"""
+    if data.startswith(b'\xff\xd8'):
+        return 'image/jpeg'
+    if data.startswith(b'\x89PNG'):
+        return 'image/png'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    if data.startswith(b'GIF8'):
+        return 'image/gif'
+    head = data[:256].lstrip().lower()
+    if head.startswith(b'<svg') or (head.startswith(b'<?xml') and b'<svg' in data[:1024].lower()):
+        return 'image/svg+xml'
+    return 'application/octet-stream'
+
+def image_version(url):
+    """Short hash of the source URL, used to make thumbnail URLs immutable"""
+    return hashlib.sha1((url or '').encode('utf-8')).hexdigest()[:12]
+
+
+EXTENSIONS = {
+    'image/webp': '.webp', 'image/jpeg': '.jpg', 'image/png': '.png',
+    'image/gif': '.gif', 'image/svg+xml': '.svg',
+}
+MIMETYPES = {ext: mime for mime, ext in EXTENSIONS.items()}
+
+
+class ThumbnailCache:
+    """Size-bounded on-disk LRU of resized listing images"""
+
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024, fetcher=None,
+                 size=THUMB_SIZE, quality=80, failure_ttl=FAILURE_TTL):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fetcher = fetcher or requests_fetcher
+        self.size = size
+        self.quality = quality
+        self.failure_ttl = failure_ttl
+
+        self._lock = Lock()
+        self._failures = OrderedDict()  # key -> time the failure expires, oldest first
+        self._key_locks = {}
+        self._entries = OrderedDict()  # path -> bytes, oldest first
+        self._total = 0
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        """Rebuilds the LRU order from file access times (survives restarts)"""
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.startswith('.'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((max(st.st_atime, st.st_mtime), path, st.st_size))
+        for _, path, size in sorted(files):
+            self._entries[path] = size
+            self._total += size
+
+    def _key(self, url):
+        return hashlib.sha256(f'{url}|{self.size[0]}x{self.size[1]}|{self.quality}'.encode('utf-8')).hexdigest()
+
+    def _find(self, key):
+        """Path of the stored thumbnail, checked on disk.
+
+        Several worker processes share the directory: a file another worker
+        stored is adopted into this index, one it evicted counts as a miss.
+        """
+        folder = os.path.join(self.directory, key[:2])
+        for ext in MIMETYPES:
+            path = os.path.join(folder, key + ext)
+            try:
+                size = os.stat(path).st_size
+            except OSError:
+                if path in self._entries:
+                    with self._lock:
+                        self._total -= self._entries.pop(path, 0)
+                continue
+            if path not in self._entries:
+                with self._lock:
+                    if path not in self._entries:
+                        self._entries[path] = size
+                        self._total += size
+                        self._evict()
+            return path
+        return None
+
+    def _touch(self, path):
+        with self._lock:
+            self._entries.move_to_end(path)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _thumbnail(self, data):
+        """Returns (bytes, mimetype) for the resized image, or the original if it can't be decoded"""
+        mimetype = sniff_mimetype(data)
+        Image = load_pil()
+        if mimetype == 'application/octet-stream':
+            raise ImageUnavailable("not an image")
+        if Image is None or mimetype == 'image/svg+xml':
+            return data, mimetype
+        from io import BytesIO
+        try:
+            img = Image.open(BytesIO(data))
+            img.thumbnail(self.size)
+            if img.mode not in ('RGB', 'RGBA'):
+                img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+            out = BytesIO()
+            try:
+                img.save(out, 'WEBP', quality=self.quality, method=4)
+                return out.getvalue(), 'image/webp'
+            except (OSError, KeyError):
+                # Pillow built without WebP support
+                out = BytesIO()
+                img.convert('RGB').save(out, 'JPEG', quality=self.quality, optimize=True, progressive=True)
+                return out.getvalue(), 'image/jpeg'
+        except Exception:
+            return data, mimetype
+
+    def _store(self, key, data, mimetype):
+        folder = os.path.join(self.directory, key[:2])
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, key + EXTENSIONS[mimetype])
+        fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.tmp-')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            old = self._entries.pop(path, 0)
+            self._entries[path] = len(data)
+            self._total += len(data) - old
+            self._evict()
+        return path
+
+    def _evict(self):
+        # Called with self._lock held; never evicts the newest entry
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            path, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _failed_recently(self, key):
+        with self._lock:
+            expires = self._failures.get(key)
+            if expires is None:
+                return False
+            if expires > time.time():
+                return True
+            del self._failures[key]
+            return False
+
+    def _remember_failure(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+            self._failures[key] = time.time() + self.failure_ttl
+            while len(self._failures) > MAX_FAILURES:
+                self._failures.popitem(last=False)
+
+    def get(self, url):
+        """(path, mimetype, hit) for the thumbnail of url, fetching it on a miss.
+
+        Raises ImageUnavailable for URLs that failed within failure_ttl or
+        aren't images, and the fetcher's error when a download fails.
+        """
+        key = self._key(url)
+        path = self._find(key)
+        if path:
+            self._touch(path)
+            return path, MIMETYPES[os.path.splitext(path)[1]], True
+        if self._failed_recently(key):
+            raise ImageUnavailable("fetch failed recently")
+
+        # One download per image even with concurrent requests
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, Lock())
+        with key_lock:
+            path = self._find(key)
+            if path:
+                return path, MIMETYPES[os.path.splitext(path)[1]], True
+            try:
+                data, mimetype = self._thumbnail(self.fetcher(url))
+                path = self._store(key, data, mimetype)
+            except Exception:
+                self._remember_failure(key)
+                raise
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+        return path, mimetype, False
+
+    @property
+    def total_bytes(self):
+        return self._total
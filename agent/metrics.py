@@ -0,0 +1,216 @@
+"""
+AracımSağlam - In-process metrics
+
+Small counter/histogram registry rendered in the Prometheus text format
+(served at /api/metrics). Values are per process; with several gunicorn
+workers each worker reports its own numbers.
+"""
+import sys
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+
+# Seconds; covers fast in-memory stages up to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}' for k, v in items]
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if idx < len(self.buckets):
+                series[idx] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, ("le", _format_value(float(bound))))} {cumulative}')
+            lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, ("le", "+Inf"))} {series[-1]}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(float(series[-2]))}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}')
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at scrape time"""
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, fn, kind='gauge'):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+        self.kind = kind
+
+    def render(self):
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        return [f'{self.name} {_format_value(value)}']
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = Lock()
+
+    def register(self, metric):
+        with self._lock:
+            # Re-registering returns the existing metric (module reloads, tests)
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for m in metrics:
+            lines.append(f'# HELP {m.name} {m.help}')
+            lines.append(f'# TYPE {m.name} {m.kind}')
+            lines.extend(m.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def counter(name, help_text, labelnames=()):
+    return REGISTRY.register(Counter(name, help_text, labelnames))
+
+def histogram(name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.register(Histogram(name, help_text, labelnames, buckets))
+
+def gauge(name, help_text, fn, kind='gauge'):
+    """kind='counter' exposes a monotonically increasing callback value"""
+    return REGISTRY.register(Gauge(name, help_text, fn, kind))
+
+def render():
+    return REGISTRY.render()
+
+
+# --- Shared application metrics ---
+
+REQUEST_SECONDS = histogram(
+    'aracimsaglam_http_request_duration_seconds',
+    'Request latency per route', ('route', 'method', 'status'))
+STAGE_SECONDS = histogram(
+    'aracimsaglam_stage_duration_seconds',
+    'Time spent in each stage of a request', ('route', 'stage'))
+LLM_SECONDS = histogram(
+    'aracimsaglam_llm_request_duration_seconds',
+    'Duration of LLM calls', ('route', 'provider', 'outcome'))
+LLM_TOKENS = counter(
+    'aracimsaglam_llm_tokens_total',
+    'Tokens reported by the LLM provider', ('route', 'provider', 'kind'))
+CACHE_REQUESTS = counter(
+    'aracimsaglam_cache_requests_total',
+    'Cache lookups by cache and result (hit/miss)', ('cache', 'result'))
+LLM_ADMISSIONS = counter(
+    'aracimsaglam_llm_admissions_total',
+    'LLM call admission decisions (admitted/rate_limited/shed)', ('route', 'decision'))
+
+def span(route, stage):
+    """Times one stage of a request: `with span('assistant', 'filter'): ...`"""
+    return STAGE_SECONDS.time(route=route, stage=stage)
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+def record_llm_usage(route, provider, usage):
+    """Adds token counts from an OpenAI-style usage object (if present)"""
+    if usage is None:
+        return
+    for kind in ('prompt_tokens', 'completion_tokens'):
+        value = getattr(usage, kind, None)
+        if value is None and isinstance(usage, dict):
+            value = usage.get(kind)
+        if value:
+            LLM_TOKENS.inc(value, route=route, provider=provider, kind=kind.split('_')[0])
+
+@contextmanager
+def time_llm(route, provider):
+    """Times an LLM call; outcome is 'error' if the block raises, 'cancelled' if a race was lost"""
+    start = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    except BaseException as e:
+        # asyncio is only loaded by the async app; don't import it for the sync one
+        asyncio = sys.modules.get('asyncio')
+        if asyncio and isinstance(e, asyncio.CancelledError):
+            outcome = 'cancelled'
+        raise
+    finally:
+        LLM_SECONDS.observe(time.perf_counter() - start, route=route, provider=provider, outcome=outcome)
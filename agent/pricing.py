@@ -0,0 +1,162 @@
+"""
+AracımSağlam - Price fairness scoring
+
+Fits a simple hedonic price model once per catalog version, vectorized
+with NumPy:
+
+    log(price) = intercept[brand/model] + b * age + c * log(1 + km)
+
+The age and km slopes are shared and estimated within segments (fixed
+effects), and each segment's intercept is shrunk toward its brand and
+the brand toward the whole catalog, so rare models still get a sensible
+expected price. Every listing then gets an expected price and a deal
+score: (expected - price) / expected, positive = cheaper than similar
+cars. Listings without a year or km (blank scraped fields) can't be
+placed on the curve: they are left out of the fit and get no expected
+price (NaN in the arrays, None on the car dicts); a listing without a
+price gets no deal score.
+
+NumPy is optional and imported on first use (it is the slowest import
+of the app); without it score_catalog() returns None and callers fall
+back to their simple heuristics.
+"""
+import math
+
+np = None
+_numpy_checked = False
+
+def _load_numpy():
+    """Imports NumPy once; returns the module or None if it isn't installed"""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+        _numpy_checked = True
+    return np
+
+# Pseudo-count pulling small segments toward their brand / the catalog
+SHRINKAGE = 5.0
+
+# deal_score thresholds used for user-facing labels
+DEAL_THRESHOLD = 0.15
+
+
+class PriceScores:
+    """Model output aligned with snapshot.cars by position"""
+
+    def __init__(self, expected, score, age_slope, km_slope):
+        self.expected = expected
+        self.score = score
+        # For ranking: unscored listings count as fairly priced
+        self.sort_score = np.nan_to_num(score, nan=0.0)
+        self.age_slope = age_slope
+        self.km_slope = km_slope
+
+    def get(self, idx):
+        """(expected_price, deal_score) for the car at position idx; None when unknown"""
+        expected, score = float(self.expected[idx]), float(self.score[idx])
+        return (None if math.isnan(expected) else expected,
+                None if math.isnan(score) else score)
+
+
+def _model_key(car):
+    return str(car.get('model', '')).lower()
+
+def _group_mean(codes, values, counts):
+    sums = np.bincount(codes, weights=values, minlength=len(counts))
+    return sums / np.maximum(counts, 1)
+
+def fit(snapshot):
+    """Fits the model on a catalog snapshot and returns PriceScores (needs NumPy)"""
+    _load_numpy()
+    rows = snapshot.rows
+    n = len(rows)
+    if n == 0:
+        empty = np.zeros(0)
+        return PriceScores(empty, empty, 0.0, 0.0)
+    unknown = np.full(n, np.nan)
+
+    price = np.fromiter((r['price'] for r in rows), dtype=np.float64, count=n)
+    year = np.fromiter((r['year'] for r in rows), dtype=np.float64, count=n)
+    km = np.fromiter((r['km'] for r in rows), dtype=np.float64, count=n)
+
+    ref_year = year.max() if year.max() > 0 else 0
+    age = np.where(year > 0, ref_year - year, 0.0)
+    log_km = np.log1p(np.maximum(km, 0))
+
+    brands = np.array([r['brand'] for r in rows], dtype=object)
+    segments = np.array([f"{r['brand']}|{_model_key(c)}" for r, c in zip(rows, snapshot.cars)], dtype=object)
+    _, brand_code = np.unique(brands, return_inverse=True)
+    seg_keys, seg_code = np.unique(segments, return_inverse=True)
+    n_brands, n_segs = brand_code.max() + 1, len(seg_keys)
+
+    # Brand of each segment (segments never span brands)
+    seg_brand = np.zeros(n_segs, dtype=np.int64)
+    seg_brand[seg_code] = brand_code
+
+    # Blank year / km would read as a brand new, unused car
+    has_km = np.fromiter((bool(str(c.get('km') or '').strip()) for c in snapshot.cars), dtype=bool, count=n)
+    known = (year > 0) & has_km
+    valid = (price > 0) & known
+    if not valid.any():
+        return PriceScores(unknown, unknown.copy(), 0.0, 0.0)
+
+    y = np.log(price[valid])
+    a = age[valid]
+    k = log_km[valid]
+    g = seg_code[valid]
+    b = brand_code[valid]
+
+    # Shared slopes from within-segment variation
+    seg_count = np.bincount(g, minlength=n_segs).astype(np.float64)
+    X = np.column_stack([a - _group_mean(g, a, seg_count)[g],
+                         k - _group_mean(g, k, seg_count)[g]])
+    yd = y - _group_mean(g, y, seg_count)[g]
+    if len(y) >= 3 and np.linalg.matrix_rank(X) == 2:
+        (age_slope, km_slope), *_ = np.linalg.lstsq(X, yd, rcond=None)
+    else:
+        age_slope, km_slope = 0.0, 0.0
+
+    # Intercepts, shrunk segment -> brand -> catalog
+    resid = y - age_slope * a - km_slope * k
+    global_int = resid.mean()
+    brand_count = np.bincount(b, minlength=n_brands).astype(np.float64)
+    brand_int = (np.bincount(b, weights=resid, minlength=n_brands) + SHRINKAGE * global_int) / (brand_count + SHRINKAGE)
+    seg_int = (np.bincount(g, weights=resid, minlength=n_segs) + SHRINKAGE * brand_int[seg_brand]) / (seg_count + SHRINKAGE)
+
+    expected = np.where(known, np.exp(seg_int[seg_code] + age_slope * age + km_slope * log_km), np.nan)
+    score = np.where(valid, (expected - price) / expected, np.nan).clip(-1.0, 1.0)
+    return PriceScores(expected, score, float(age_slope), float(km_slope))
+
+def score_catalog(snapshot):
+    """PriceScores for this catalog version (fitted once), or None without NumPy.
+
+    Also stores `expected_price` and `deal_score` on each car dict so API
+    responses carry them.
+    """
+    if _load_numpy() is None:
+        return None
+
+    def compute():
+        scores = fit(snapshot)
+        expected = np.round(scores.expected).tolist()
+        deal = np.round(scores.score, 3).tolist()
+        for car, e, d in zip(snapshot.cars, expected, deal):
+            car['expected_price'] = None if math.isnan(e) else int(e)
+            car['deal_score'] = None if math.isnan(d) else d
+        return scores
+
+    return snapshot.memo('pricing', compute)
+
+def deal_label(score):
+    """Short Turkish label for a deal score"""
+    if score is None or (isinstance(score, float) and math.isnan(score)):
+        return None
+    if score >= DEAL_THRESHOLD:
+        return "FIRSAT"
+    if score <= -DEAL_THRESHOLD:
+        return "PAHALI"
+    return "PİYASA DEĞERİNDE"
@@ -0,0 +1,156 @@
+"""
+AracımSağlam - Rate limiting and admission control
+
+Two guards in front of the LLM-backed endpoints:
+
+- A token bucket per (endpoint, client IP): `rate` tokens per second up to
+  `burst`. Kept in process memory, or in a Redis-compatible server when
+  several workers should share one budget (the `redis` package is
+  optional; on any Redis error the in-memory buckets take over).
+- An admission gate bounding the number of LLM calls in flight, so a
+  burst sheds load instead of queueing behind slow completions.
+
+Callers that are refused fall back to the local (heuristic) reply.
+"""
+import math
+import time
+from threading import Lock
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class MemoryLimiter:
+    """Token buckets in process memory"""
+
+    # Every N calls, drop buckets that have refilled completely (keeps memory bounded)
+    _SWEEP_EVERY = 1024
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}  # key -> (tokens, last timestamp)
+        self._lock = Lock()
+        self._calls = 0
+
+    def allow(self, key, cost=1):
+        """Takes `cost` tokens from the key's bucket; False if it doesn't have them"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+
+            self._calls += 1
+            if self._calls % self._SWEEP_EVERY == 0:
+                self._sweep(now)
+        return allowed
+
+    def _sweep(self, now):
+        # Called with self._lock held
+        refill = self.burst / self.rate if self.rate else 0
+        for key in [k for k, (_, last) in self._buckets.items() if now - last > refill]:
+            del self._buckets[key]
+
+
+# Atomic refill-and-take on a Redis hash {t: tokens, ts: timestamp}
+_REDIS_BUCKET = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 't', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 't', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return allowed
+"""
+
+
+class RedisLimiter:
+    """Token buckets shared by all workers through Redis"""
+
+    def __init__(self, url, rate, burst, prefix='aracimsaglam:rl:'):
+        self.rate = rate
+        self.burst = burst
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self._script = self._client.register_script(_REDIS_BUCKET)
+        self._ttl = max(1, math.ceil(burst / rate) + 1) if rate else 3600
+        self._fallback = MemoryLimiter(rate, burst)
+        self._failing = False
+
+    def allow(self, key, cost=1):
+        try:
+            allowed = self._script(keys=[self.prefix + key],
+                                   args=[self.rate, self.burst, time.time(), cost, self._ttl])
+            self._failing = False
+            return bool(allowed)
+        except Exception as e:
+            if not self._failing:
+                print(f"Rate limit Redis Error: {e} (falling back to in-memory buckets)")
+                self._failing = True
+            return self._fallback.allow(key, cost)
+
+
+def make_limiter(per_minute, burst, redis_url=None):
+    """Limiter for `per_minute` requests per key, or None when disabled (per_minute <= 0)"""
+    if per_minute <= 0:
+        return None
+    rate = per_minute / 60.0
+    burst = max(1, burst)
+    if redis_url:
+        if redis is None:
+            print("⚠️ RATE_LIMIT_REDIS_URL ayarlı ama 'redis' paketi yüklü değil, bellek içi limit kullanılıyor.")
+        else:
+            return RedisLimiter(redis_url, rate, burst)
+    return MemoryLimiter(rate, burst)
+
+
+def forwarded_client(value, header, hops=1):
+    """Client address from the value of the trusted proxy header, or None.
+
+    Every proxy appends to X-Forwarded-For, so only the entry our own
+    proxies added (`hops` from the right) is trusted; entries to its left
+    are whatever the client sent. Other headers (CF-Connecting-IP,
+    X-Real-IP) are set by the proxy and read as-is.
+    """
+    if not value:
+        return None
+    if header.lower() == 'x-forwarded-for':
+        parts = [p.strip() for p in value.split(',') if p.strip()]
+        return parts[-hops] if 0 < hops <= len(parts) else None
+    return value.strip() or None
+
+
+class AdmissionGate:
+    """Non-blocking bound on concurrent LLM calls"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self._lock = Lock()
+
+    def try_acquire(self):
+        """Takes a slot if one is free; never waits. limit <= 0 means unbounded."""
+        with self._lock:
+            if 0 < self.limit <= self.in_flight:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
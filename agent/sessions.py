@@ -0,0 +1,125 @@
+"""
+AracımSağlam - Assistant conversation sessions
+
+Keeps what a conversation has asked for so far (merged search criteria,
+last result ids, recent messages) so follow-ups like "daha ucuzu var mı?"
+refine the previous search instead of starting over.
+
+State lives in an in-memory LRU bounded by count and idle time (TTL).
+States are plain JSON-able dicts (arrays are stored as lists).
+With a db_path (SESSION_DB) every update is also written to SQLite and
+the SQLite row is authoritative: get() checks its timestamp and only uses
+the in-memory copy when no other worker has updated the session since.
+Sessions thus survive restarts and are shared by the workers on one
+machine. The connection is opened lazily in each process, so a store
+created before gunicorn forks (preload_app) never shares one.
+"""
+import json
+import os
+import secrets
+import sqlite3
+import time
+from collections import OrderedDict
+from threading import Lock
+
+DEFAULT_MAX_SESSIONS = 10000
+DEFAULT_TTL = 30 * 60
+
+
+def new_session_id():
+    return secrets.token_urlsafe(16)
+
+def valid_session_id(session_id):
+    return isinstance(session_id, str) and 8 <= len(session_id) <= 64 and session_id.replace('-', '').replace('_', '').isalnum()
+
+
+class SessionStore:
+    def __init__(self, max_sessions=DEFAULT_MAX_SESSIONS, ttl=DEFAULT_TTL, db_path=None):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._entries = OrderedDict()  # session id -> (last used, state), oldest first
+        self._lock = Lock()
+        self._db_path = db_path
+        self._db = None
+        self._db_pid = None  # process that opened _db
+        self._db_lock = Lock()
+        self._writes = 0
+
+    def get(self, session_id):
+        """State of a live session, or None (unknown or expired)"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                if now - entry[0] > self.ttl:
+                    del self._entries[session_id]
+                    entry = None
+                else:
+                    self._entries.move_to_end(session_id)
+        if not self._db_path:
+            return entry[1] if entry else None
+        return self._load(session_id, now, entry)
+
+    def put(self, session_id, state):
+        now = time.time()
+        self._remember(session_id, now, state)
+        self._save(session_id, state, now)
+
+    def _remember(self, session_id, used, state):
+        with self._lock:
+            self._entries[session_id] = (used, state)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+    # --- SQLite persistence ---
+
+    def _connection(self):
+        """This process's connection (call with _db_lock held)"""
+        if self._db_pid != os.getpid():
+            # First use, or a forked child: never reuse the parent's handle
+            db = sqlite3.connect(self._db_path, check_same_thread=False, timeout=5)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('CREATE TABLE IF NOT EXISTS sessions '
+                       '(id TEXT PRIMARY KEY, state TEXT NOT NULL, updated REAL NOT NULL)')
+            db.commit()
+            self._db, self._db_pid = db, os.getpid()
+        return self._db
+
+    def _load(self, session_id, now, entry=None):
+        """State from the DB row; the in-memory entry is reused if it is that same update"""
+        try:
+            with self._db_lock:
+                row = self._connection().execute('SELECT state, updated FROM sessions WHERE id = ?', (session_id,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"Session DB Error: {e}")
+            return entry[1] if entry else None
+        if row is None:
+            # Not saved (a failed write) or purged: memory is all there is
+            return entry[1] if entry else None
+        if now - row[1] > self.ttl:
+            return None
+        if entry is not None and entry[0] == row[1]:
+            return entry[1]
+        state = json.loads(row[0])
+        self._remember(session_id, row[1], state)
+        return state
+
+    def _save(self, session_id, state, now):
+        if not self._db_path:
+            return
+        try:
+            with self._db_lock:
+                db = self._connection()
+                db.execute('INSERT OR REPLACE INTO sessions (id, state, updated) VALUES (?, ?, ?)',
+                                 (session_id, json.dumps(state, default=list), now))
+                self._writes += 1
+                # Drop expired rows now and then
+                if self._writes % 1000 == 0:
+                    db.execute('DELETE FROM sessions WHERE updated < ?', (now - self.ttl,))
+                db.commit()
+        except sqlite3.Error as e:
+            print(f"Session DB Error: {e}")
@@ -0,0 +1,244 @@
+"""
+AracımSağlam - Async application (ASGI)
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+
+POST /api/assistant is served natively async: the catalog search runs in a
+worker thread while other conversations keep waiting on their LLM calls,
+and the reply comes from AsyncOpenAI and local Ollama raced against each
+other (first non-empty answer wins, the slower call is cancelled). One
+process can hold hundreds of LLM conversations in flight instead of one
+per thread.
+
+Every other route is the regular Flask app (run_app.py) behind a WSGI
+adapter (a2wsgi, or the one bundled with uvicorn), so both entry points
+share the catalog, caches, rate limits and metrics.
+"""
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from uvicorn.middleware.wsgi import WSGIMiddleware  # a2wsgi when installed
+
+import run_app
+import metrics
+from metrics import span
+from car_catalog import turkish_lower
+from assistant import find_matches, build_messages, completion_prompt, local_reply, session_state
+from rate_limit import AdmissionGate
+
+ROUTE = 'assistant'
+
+# Providers raced for each reply, in order of preference on ties
+LLM_PROVIDERS = [p.strip() for p in os.environ.get('ASSISTANT_LLM_PROVIDERS', 'openai,ollama').split(',') if p.strip()]
+OPENAI_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-4o')
+OLLAMA_URL = os.environ.get('OLLAMA_URL', 'http://localhost:11434/api/generate')
+OLLAMA_MODEL = os.environ.get('OLLAMA_MODEL', 'llama3.2')
+LLM_TIMEOUT = float(os.environ.get('ASSISTANT_LLM_TIMEOUT', 60))
+# Waiting on the network costs no thread here, so the bound is much higher than the sync app's
+ASYNC_LLM_MAX_IN_FLIGHT = int(os.environ.get('ASYNC_LLM_MAX_IN_FLIGHT', 256))
+# Threads running the Flask routes, and the catalog searches
+WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', 32))
+
+llm_gate = AdmissionGate(ASYNC_LLM_MAX_IN_FLIGHT)
+executor = ThreadPoolExecutor(max_workers=WSGI_THREADS, thread_name_prefix='asgi-search')
+flask_app = WSGIMiddleware(run_app.app, workers=WSGI_THREADS)
+
+metrics.gauge('aracimsaglam_async_llm_in_flight', 'LLM conversations in flight in the async app',
+              lambda: llm_gate.in_flight)
+
+
+# --- LLM clients (created on first use, inside the event loop) ---
+
+_openai = None
+_http = None
+
+def get_openai():
+    """AsyncOpenAI client, or None without OPENAI_API_KEY"""
+    global _openai
+    if _openai is None and os.environ.get('OPENAI_API_KEY'):
+        from openai import AsyncOpenAI
+        _openai = AsyncOpenAI(api_key=os.environ['OPENAI_API_KEY'])
+    return _openai
+
+def get_http():
+    global _http
+    if _http is None:
+        import httpx
+        _http = httpx.AsyncClient(timeout=LLM_TIMEOUT,
+                                  limits=httpx.Limits(max_connections=ASYNC_LLM_MAX_IN_FLIGHT))
+    return _http
+
+async def ask_openai(messages):
+    client = get_openai()
+    if client is None:
+        return None
+    with metrics.time_llm(ROUTE, 'openai'):
+        completion = await client.chat.completions.create(
+            model=OPENAI_MODEL, messages=messages, timeout=LLM_TIMEOUT)
+    metrics.record_llm_usage(ROUTE, 'openai', getattr(completion, 'usage', None))
+    return completion.choices[0].message.content
+
+async def ask_ollama(messages):
+    with metrics.time_llm(ROUTE, 'ollama'):
+        response = await get_http().post(OLLAMA_URL, json={
+            "model": OLLAMA_MODEL,
+            "prompt": completion_prompt(messages),
+            "stream": False
+        })
+    if response.status_code != 200:
+        return None
+    data = response.json()
+    metrics.record_llm_usage(ROUTE, 'ollama', {
+        'prompt_tokens': data.get('prompt_eval_count'),
+        'completion_tokens': data.get('eval_count'),
+    })
+    return data.get('response')
+
+PROVIDERS = {'openai': ask_openai, 'ollama': ask_ollama}
+
+def available_providers():
+    """Configured providers that can be called (OpenAI needs an API key)"""
+    return [name for name in LLM_PROVIDERS
+            if name == 'ollama' or (name == 'openai' and get_openai() is not None)]
+
+async def race(messages, providers=None):
+    """(provider, text) of the first provider to answer with text, or (None, None)"""
+    tasks = {asyncio.ensure_future(PROVIDERS[name](messages)): name
+             for name in (providers or available_providers())}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Prefer the configured order when several finish together
+            for task in sorted(done, key=lambda t: list(tasks.values()).index(tasks[t])):
+                try:
+                    text = task.result()
+                except Exception as e:
+                    print(f"{tasks[task]} Error: {e or type(e).__name__}")
+                    continue
+                if text:
+                    return tasks[task], text
+        return None, None
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+# --- /api/assistant ---
+
+def admit(scope, headers):
+    """None if the LLM may be called (slot taken), else the reason it may not"""
+    client = scope.get('client')
+    decision = run_app.llm_admission(ROUTE, llm_gate, headers, client[0] if client else None)
+    return None if decision == 'admitted' else decision
+
+def search(user_msg, session_id):
+    """(session id, previous state, criteria, filtered, matches); runs in a worker thread"""
+    with span(ROUTE, 'load_cars'):
+        snapshot = run_app.catalog.snapshot()
+    session_id, previous = run_app.get_session(session_id)
+    criteria, filtered, matches = find_matches(snapshot, user_msg, previous=previous)
+    run_app.session_store.put(session_id, session_state(snapshot, user_msg, criteria, filtered, previous))
+    return session_id, previous, criteria, filtered, matches
+
+async def assistant(scope, headers, body):
+    """Returns (status, payload, extra headers)"""
+    try:
+        data = json.loads(body or b'{}')
+    except ValueError:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    user_msg = turkish_lower(str(data.get('message', '')))
+
+    loop = asyncio.get_running_loop()
+    session_id, previous, criteria, filtered, matches = await loop.run_in_executor(
+        executor, search, user_msg, data.get('session_id'))
+
+    extra = []
+    providers = available_providers()
+    if providers:
+        degraded = admit(scope, headers)
+        if degraded is None:
+            try:
+                with span(ROUTE, 'llm'):
+                    provider, text = await race(build_messages(user_msg, matches, previous, criteria), providers)
+            finally:
+                llm_gate.release()
+            if text:
+                return 200, {'reply': text, 'matches': matches, 'session_id': session_id}, [(b'x-llm-provider', provider.encode())]
+        else:
+            extra.append((b'x-llm-degraded', degraded.encode()))
+
+    # LOCAL FALLBACK
+    return 200, {'reply': local_reply(criteria, filtered, matches), 'matches': matches,
+                 'session_id': session_id}, extra
+
+
+# --- ASGI plumbing ---
+
+def cors_headers(headers):
+    origin = headers.get('origin')
+    if not origin:
+        return []
+    if run_app.cors_origin == '*':
+        return [(b'access-control-allow-origin', b'*')]
+    allowed = [o.strip() for o in run_app.cors_origin.split(',')]
+    if origin in allowed:
+        return [(b'access-control-allow-origin', origin.encode('latin-1')), (b'vary', b'Origin')]
+    return []
+
+async def read_body(receive):
+    body = b''
+    more = True
+    while more:
+        message = await receive()
+        body += message.get('body', b'')
+        more = message.get('more_body', False)
+    return body
+
+async def send_response(send, status, body, headers):
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+async def http(scope, receive, send):
+    if not (scope['path'] == '/api/assistant' and scope['method'] == 'POST'):
+        await flask_app(scope, receive, send)
+        return
+
+    start = time.perf_counter()
+    body = await read_body(receive)
+    headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope.get('headers', [])}
+    status, payload, extra = await assistant(scope, headers, body)
+    await send_response(send, status, json.dumps(payload).encode('utf-8'),
+                        [(b'content-type', b'application/json')] + extra + cors_headers(headers))
+    metrics.REQUEST_SECONDS.observe(time.perf_counter() - start, route='/api/assistant',
+                                    method='POST', status=status)
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(executor, run_app.warm_up)
+            interval = float(os.environ.get('CATALOG_WATCH_INTERVAL', 5))
+            if interval > 0:
+                run_app.catalog.start_watcher(interval)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if _http is not None:
+                await _http.aclose()
+            if _openai is not None:
+                await _openai.close()
+            executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    if scope['type'] == 'http':
+        await http(scope, receive, send)
+    elif scope['type'] == 'lifespan':
+        await lifespan(receive, send)
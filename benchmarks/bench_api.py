@@ -0,0 +1,208 @@
+"""
+API benchmark with synthetic catalogs
+
+Replays Turkish assistant messages, catalog listings, facet queries and
+car analyses through the Flask test client with the LLM stubbed out, and reports
+p50/p95/p99 latency, throughput and peak RSS per endpoint. Each catalog
+size runs in its own subprocess so peak RSS is not shared between runs.
+
+Usage:
+    python benchmarks/bench_api.py                       # 10k, 100k, 1M
+    python benchmarks/bench_api.py --sizes 10000 --requests 500
+    python benchmarks/bench_api.py --output bench.json   # machine readable
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_catalog import ensure_catalog
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+
+# Realistic assistant queries (intent parser features: brand, city suffix,
+# fuel, transmission, year, budget, sorting)
+MESSAGES = [
+    "İstanbul'da 1 milyon altı otomatik araba arıyorum",
+    "Ankarada dizel manuel en ucuz araç hangisi?",
+    "2018 ve üstü BMW önerir misin",
+    "500k - 1m arası benzinli aile aracı",
+    "İzmirde hibrit toyota var mı",
+    "en az km olan 2020 sonrası volkswagen",
+    "2m altı elektrikli araç öner",
+    "bursadaki otomatik mercedesler",
+    "Öğrenciyim, 750.000 tl altında ilk arabamı arıyorum",
+    "2016-2019 arası renault clio",
+    "lpg'li ucuz araba",
+    "en iyi suv hangisi, bütçem 3 milyon",
+    "Antalya'da kiralık değil satılık audi",
+    "kilometresi düşük fiat egea",
+    "motorin yakan otomatik vites hyundai tucson",
+    "merhaba, bana araba önerir misin?",
+    "3 milyon altı volvo xc60 istanbul",
+    "2022 üzeri tesla model y",
+    "dacia duster manuel dizel en ucuz",
+    "Konyada 400 bin altı araç",
+]
+
+# Filter sets as the filter UI would send them to /api/facets
+FACET_QUERIES = [
+    '',
+    'city=Ankara',
+    'fuel=Dizel,LPG',
+    'brand=BMW&brand=Audi&year=2018-2020',
+    'city=İstanbul&transmission=Otomatik&price=1000000-1500000',
+    'fuel=Benzin&year=2023-&price=-500000',
+]
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+def summarize(timings):
+    timings = sorted(timings)
+    total = sum(timings)
+    return {
+        'requests': len(timings),
+        'p50_ms': percentile(timings, 50) * 1000,
+        'p95_ms': percentile(timings, 95) * 1000,
+        'p99_ms': percentile(timings, 99) * 1000,
+        'throughput_rps': len(timings) / total if total else 0.0,
+    }
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def run_worker(catalog_path, requests, cars_requests, llm_latency):
+    """Runs inside the subprocess: benchmarks one catalog and returns the results"""
+    os.environ['CARS_PATH'] = catalog_path
+    # Every benchmark request comes from the test client's address
+    os.environ.setdefault('RATE_LIMIT_PER_MIN', '0')
+    sys.path.insert(0, BASE_DIR)
+
+    from stub_llm import StubOpenAI
+    import run_app
+
+    run_app.client = StubOpenAI(latency=llm_latency)
+    client = run_app.app.test_client()
+
+    start = time.perf_counter()
+    snapshot = run_app.catalog.snapshot()
+    cold_load = time.perf_counter() - start
+    size = len(snapshot.cars)
+
+    def timed(fn):
+        t = time.perf_counter()
+        response = fn()
+        elapsed = time.perf_counter() - t
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        return elapsed
+
+    results = {}
+
+    timings = []
+    for i in range(requests):
+        message = MESSAGES[i % len(MESSAGES)]
+        timings.append(timed(lambda: client.post('/api/assistant', json={'message': message})))
+    results['/api/assistant'] = summarize(timings)
+
+    timings = []
+    for _ in range(cars_requests):
+        timings.append(timed(lambda: client.get('/api/cars')))
+    results['/api/cars'] = summarize(timings)
+
+    timings = []
+    for i in range(requests):
+        query = FACET_QUERIES[i % len(FACET_QUERIES)]
+        timings.append(timed(lambda: client.get(f'/api/facets?{query}')))
+    results['/api/facets'] = summarize(timings)
+
+    # Distinct ids spread over the catalog, so every call misses the analysis cache
+    timings = []
+    step = max(1, size // max(1, requests))
+    for i in range(requests):
+        car_id = snapshot.cars[(i * step) % size]['id'] if size else '1'
+        timings.append(timed(lambda: client.get(f'/api/analyze/{car_id}')))
+    results['/api/analyze'] = summarize(timings)
+
+    return {
+        'catalog_size': size,
+        'cold_load_s': cold_load,
+        'peak_rss_mb': peak_rss_mb(),
+        'endpoints': results,
+    }
+
+
+def print_report(report):
+    print(f"\n📦 {report['catalog_size']:,} ilan | katalog yükleme {report['cold_load_s']:.2f}s"
+          + (f" | peak RSS {report['peak_rss_mb']:.0f} MB" if report['peak_rss_mb'] else ""))
+    print(f"  {'endpoint':<16}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for endpoint, r in report['endpoints'].items():
+        print(f"  {endpoint:<16}{r['requests']:>6}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+              f"{r['p99_ms']:>10.2f}{r['throughput_rps']:>10.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark /api/assistant, /api/cars, /api/facets and /api/analyze')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='Comma separated catalog sizes (default: 10000,100000,1000000)')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint')
+    parser.add_argument('--cars-requests', type=int, default=10,
+                        help='Requests for /api/cars (serializes the whole catalog)')
+    parser.add_argument('--llm-latency', type=float, default=0.0,
+                        help='Simulated LLM latency in seconds (default: 0, measure app overhead only)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        report = run_worker(args.worker, args.requests, args.cars_requests, args.llm_latency)
+        print(json.dumps(report))
+        return
+
+    reports = []
+    for size in [int(s) for s in args.sizes.split(',') if s.strip()]:
+        print(f"⏳ {size:,} ilanlık katalog hazırlanıyor...")
+        path = ensure_catalog(size, args.seed)
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker', path,
+             '--requests', str(args.requests), '--cars-requests', str(args.cars_requests),
+             '--llm-latency', str(args.llm_latency)],
+            capture_output=True, text=True, cwd=BASE_DIR)
+        if proc.returncode != 0:
+            print(proc.stderr, file=sys.stderr)
+            sys.exit(proc.returncode)
+        report = json.loads(proc.stdout.strip().splitlines()[-1])
+        print_report(report)
+        reports.append(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2)
+        print(f"\n✅ Sonuçlar kaydedildi: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
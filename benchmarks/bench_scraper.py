@@ -0,0 +1,193 @@
+"""
+Offline scraper parse throughput
+
+Builds a page cache of synthetic sahibinden.com result pages (markup with
+the selectors both scrapers read, listings from synthetic_catalog.py),
+then replays it:
+
+- checks that SahibindenScraper and SahibindenAPIScraper return the
+  expected listings in replay mode (no network, no Chrome),
+- measures parse throughput in pages/s and listings/s, optionally over
+  several processes.
+
+Exits non-zero if the parsed listings don't match what was generated, so
+it doubles as a parser regression check. A recorded cache
+(SCRAPER_CACHE_MODE=record) can be benchmarked with --cache-dir.
+
+Usage:
+    python benchmarks/bench_scraper.py --pages 2000
+    python benchmarks/bench_scraper.py --pages 5000 --workers 4
+    python benchmarks/bench_scraper.py --cache-dir cache/pages --no-generate
+"""
+import argparse
+import contextlib
+import html
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, 'scraper'))
+
+from synthetic_catalog import CACHE_DIR, generate
+from page_cache import PageCache
+from sahibinden_scraper import SahibindenScraper
+from sahibinden_api_scraper import SahibindenAPIScraper
+
+SEARCH_URL = "https://www.sahibinden.com/otomobil"
+API_SEARCH_PATHS = ["/otomobil/volkswagen", "/otomobil/renault", "/otomobil/toyota",
+                    "/otomobil/fiat", "/otomobil/hyundai"]
+
+# Roughly the size of the header/filters/footer around a real results table
+PAGE_HEAD = ('<!DOCTYPE html><html lang="tr"><head><meta charset="utf-8"><title>Otomobil</title>'
+             + '<link rel="preconnect" href="https://static.sahibinden.com">' * 40
+             + '</head><body><div id="container"><div class="searchResultsFilters">'
+             + '<ul><li><a href="/otomobil?sorting=price_asc">Fiyat</a></li></ul>' * 60
+             + '</div><table id="searchResultsTable" class="searchResultsTable"><thead><tr>'
+             + '<td>Model</td><td>İlan Başlığı</td><td>Yıl</td><td>KM</td><td>Fiyat</td><td>İlçe / Semt</td>'
+             + '</tr></thead><tbody class="searchResultsRowClass">')
+PAGE_TAIL = ('</tbody></table></div><footer>' + '<div class="footerLinks"><a href="/yardim">Yardım</a></div>' * 60
+             + '<script>window.dataLayer = window.dataLayer || [];</script></footer></body></html>')
+
+
+def render_row(car):
+    e = html.escape
+    return (f'<tr data-id="{e(car["id"])}" class="searchResultsItem">'
+            f'<td class="searchResultsLargeThumbnail"><a href="/ilan/{e(car["id"])}">'
+            f'<img data-src="{e(car["image"])}" src="/img/placeholder.png" alt="{e(car["title"])}" title="{e(car["title"])}"></a></td>'
+            f'<td class="searchResultsTagAttributeValue">{e(car["model"])}</td>'
+            f'<td class="searchResultsTitleValue"><a class="classifiedTitle" href="/ilan/{e(car["id"])}/detay">\n    {e(car["title"])}\n</a></td>'
+            f'<td class="searchResultsAttributeValue"> {e(car["year"])} </td>'
+            f'<td class="searchResultsAttributeValue"> {e(car["km"])} </td>'
+            f'<td class="searchResultsPriceValue"><div> {e(car["price"])} </div></td>'
+            f'<td class="searchResultsDateValue"><span>12 Ocak</span><br><span>2025</span></td>'
+            f'<td class="searchResultsLocationValue">{e(car["city"])}<br>Merkez</td>'
+            '</tr>')
+
+def render_page(cars):
+    return PAGE_HEAD + ''.join(render_row(c) for c in cars) + PAGE_TAIL
+
+def page_url(page_no):
+    return f"{SEARCH_URL}?pagingOffset={page_no * 20}"
+
+def build_cache(directory, pages, rows, seed):
+    """Stores `pages` synthetic result pages; returns {url: expected listings}"""
+    cache = PageCache(directory, mode='record')
+    cars = generate(pages * rows, seed)
+    expected = {}
+    for page_no in range(pages):
+        chunk = cars[page_no * rows:(page_no + 1) * rows]
+        page = render_page(chunk)
+        cache.put(page_url(page_no), page)
+        expected[page_url(page_no)] = chunk
+    # The URLs the scrapers request, so scrape_cars() can replay end to end
+    cache.put(SEARCH_URL, render_page(cars[:rows]))
+    for i, path in enumerate(API_SEARCH_PATHS):
+        cache.put(f"https://www.sahibinden.com{path}", render_page(cars[i * rows:(i + 1) * rows]))
+    return expected, cars[:rows]
+
+
+def check_replay(directory, first_page):
+    """Runs both scrapers against the cache only; returns a list of problems"""
+    problems = []
+    replay = PageCache(directory, mode='replay')
+
+    cars = SahibindenScraper(cache=replay).scrape_cars(max_items=len(first_page))
+    if [c['id'] for c in cars] != [c['id'] for c in first_page]:
+        problems.append(f"SahibindenScraper: {len(cars)} ilan, beklenen {len(first_page)}")
+    for got, want in zip(cars, first_page):
+        for field, key in (('title', 'title'), ('price', 'price'), ('year', 'year'), ('km', 'km'), ('image', 'image')):
+            if got[field] != want[key]:
+                problems.append(f"SahibindenScraper id={want['id']} {field}: {got[field]!r} != {want[key]!r}")
+        if not got['location'].startswith(want['city']):
+            problems.append(f"SahibindenScraper id={want['id']} location: {got['location']!r}")
+
+    api_cars = SahibindenAPIScraper(cache=replay).scrape_cars(max_items=20)
+    if len(api_cars) != 20:
+        problems.append(f"SahibindenAPIScraper: {len(api_cars)} ilan, beklenen 20")
+    if replay.misses:
+        problems.append(f"Replay önbellekte olmayan {replay.misses} sayfa istedi")
+    return problems
+
+
+def parse_batch(args):
+    """Worker: parses the given cached pages, returns (pages, listings, bytes, seconds)"""
+    directory, urls, parser_name = args
+    cache = PageCache(directory, mode='replay')
+    if parser_name == 'selenium':
+        scraper = SahibindenScraper(cache=cache)
+        parse = lambda page: scraper.parse_page(page, max_items=None)
+    else:
+        scraper = SahibindenAPIScraper(cache=cache)
+        parse = lambda page: scraper.parse_page(page, limit=10**9)
+
+    pages = [cache.get(u) for u in urls]
+    start = time.perf_counter()
+    listings = sum(len(parse(p)) for p in pages)
+    elapsed = time.perf_counter() - start
+    return len(pages), listings, sum(len(p) for p in pages), elapsed
+
+def measure(directory, urls, parser_name, workers):
+    if workers <= 1:
+        pages, listings, size, elapsed = parse_batch((directory, urls, parser_name))
+        wall = elapsed
+    else:
+        chunks = [urls[i::workers] for i in range(workers)]
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(parse_batch, [(directory, c, parser_name) for c in chunks]))
+        wall = time.perf_counter() - start
+        pages = sum(p[0] for p in parts)
+        listings = sum(p[1] for p in parts)
+        size = sum(p[2] for p in parts)
+    return {'parser': parser_name, 'pages': pages, 'listings': listings,
+            'pages_per_s': pages / wall if wall else 0.0,
+            'listings_per_s': listings / wall if wall else 0.0,
+            'mb_per_s': size / wall / 1e6 if wall else 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark scraper parsing against cached pages')
+    parser.add_argument('--pages', type=int, default=2000)
+    parser.add_argument('--rows', type=int, default=20, help='Listings per page')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=1, help='Parse in this many processes')
+    parser.add_argument('--cache-dir', default=None, help='Page cache directory (default: benchmarks/.data/pages_<pages>_<seed>)')
+    parser.add_argument('--no-generate', action='store_true', help='Benchmark an existing (recorded) cache as is')
+    args = parser.parse_args()
+
+    directory = args.cache_dir or os.path.join(CACHE_DIR, f'pages_{args.pages}_{args.seed}')
+
+    if not args.no_generate:
+        start = time.perf_counter()
+        expected, first_page = build_cache(directory, args.pages, args.rows, args.seed)
+        print(f"📦 {args.pages} sayfa önbelleğe yazıldı ({time.perf_counter() - start:.1f}s): {directory}")
+
+        # Regression check: replayed scrapes must return exactly what was generated
+        with contextlib.redirect_stdout(io.StringIO()):
+            problems = check_replay(directory, first_page)
+        if problems:
+            print("❌ Replay doğrulaması başarısız:")
+            for p in problems[:20]:
+                print(f"  - {p}")
+            raise SystemExit(1)
+        print("✓ Replay doğrulandı: iki scraper da önbellekten doğru ilanları okudu")
+        urls = list(expected)
+    else:
+        urls = PageCache(directory, mode='replay').urls()
+        if not urls:
+            raise SystemExit(f"❌ Önbellek boş: {directory}")
+
+    print(f"\n{'parser':<10}{'sayfa':>8}{'ilan':>9}{'sayfa/s':>10}{'ilan/s':>11}{'MB/s':>8}")
+    for parser_name in ('selenium', 'api'):
+        r = measure(directory, urls, parser_name, args.workers)
+        print(f"{r['parser']:<10}{r['pages']:>8}{r['listings']:>9}{r['pages_per_s']:>10.0f}"
+              f"{r['listings_per_s']:>11.0f}{r['mb_per_s']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
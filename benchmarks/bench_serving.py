@@ -0,0 +1,80 @@
+"""
+Dev server vs. gunicorn profile
+
+Runs the same fixed-rate load (load_test.py) against `python run_app.py`
+(Flask development server), `gunicorn -c gunicorn.conf.py run_app:app`
+and the async app (`uvicorn asgi_app:app`), all talking to the local mock
+LLM server, and prints the results side by side.
+
+Usage:
+    python benchmarks/bench_serving.py --rps 10,20,40 --duration 15 --mock-latency 0.8
+    python benchmarks/bench_serving.py --profiles gunicorn,asgi --rps 50,100 --mix assistant=1
+"""
+import argparse
+import json
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from load_test import parse_mix, run_step, spawn_stack
+
+PROFILES = {
+    'dev': [sys.executable, os.path.join(BASE_DIR, 'run_app.py')],
+    'gunicorn': [sys.executable, '-m', 'gunicorn', '-c', os.path.join(BASE_DIR, 'gunicorn.conf.py'), 'run_app:app'],
+    'asgi': [sys.executable, '-m', 'uvicorn', 'asgi_app:app', '--host', '127.0.0.1', '--port', '{port}',
+             '--log-level', 'warning'],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the dev server with the gunicorn profile')
+    parser.add_argument('--profiles', default='dev,gunicorn,asgi')
+    parser.add_argument('--rps', default='10,20,40')
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--mix', default='assistant=0.7,analyze=0.3')
+    parser.add_argument('--ids', default='1-10000')
+    parser.add_argument('--app-port', type=int, default=5055)
+    parser.add_argument('--mock-port', type=int, default=8089)
+    parser.add_argument('--mock-latency', default='0.8')
+    parser.add_argument('--mock-jitter', default='0.3')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    lo, _, hi = args.ids.partition('-')
+    id_range = (int(lo), int(hi or lo))
+    mix = parse_mix(args.mix)
+    rates = [float(r) for r in args.rps.split(',') if r.strip()]
+
+    results = {}
+    for name in [p.strip() for p in args.profiles.split(',') if p.strip()]:
+        print(f"\n🚀 Profil: {name}")
+        procs = spawn_stack(args.app_port, args.mock_port,
+                            ['--latency', args.mock_latency, '--jitter', args.mock_jitter],
+                            app_cmd=[a.format(port=args.app_port) for a in PROFILES[name]])
+        try:
+            results[name] = [run_step(f'http://127.0.0.1:{args.app_port}', rps, args.duration,
+                                      mix, id_range, 60, 512, 42 + i)
+                             for i, rps in enumerate(rates)]
+        finally:
+            for p in procs:
+                p.terminate()
+                p.wait()
+
+    print(f"\n{'profil':<10}{'hedef':>8}{'endpoint':>12}{'req/s':>8}{'hata':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, steps in results.items():
+        for step in steps:
+            for endpoint, r in step['endpoints'].items():
+                print(f"{name:<10}{step['target_rps']:>8.0f}{endpoint:>12}{r['achieved_rps']:>8.1f}"
+                      f"{r['errors']:>6}{r['p50_ms']:>9.0f}{r['p95_ms']:>9.0f}{r['p99_ms']:>9.0f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Sonuçlar kaydedildi: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
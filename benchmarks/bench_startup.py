@@ -0,0 +1,97 @@
+"""
+Startup-time budget check for run_app.py
+
+Launches the app as a subprocess several times and measures how long it
+takes until /api/health answers and until the background catalog warm-up
+reports "ready". Exits non-zero if the median time to a healthy response
+exceeds the budget, so it can run in CI before a deploy.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5 --budget-ms 1500
+    python benchmarks/bench_startup.py --cmd dist/AracimSaglam/AracimSaglam.exe
+"""
+import argparse
+import json
+import os
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCH_DIR)
+
+
+def poll_health(url, deadline):
+    """Returns the parsed /api/health body, or None if not answering yet"""
+    try:
+        with urllib.request.urlopen(url, timeout=0.5) as resp:
+            if resp.status == 200:
+                return json.loads(resp.read() or b'{}')
+    except Exception:
+        pass
+    if time.perf_counter() > deadline:
+        raise TimeoutError(url)
+    return None
+
+def measure_once(cmd, port, timeout):
+    env = dict(os.environ, PORT=str(port), HOST='127.0.0.1', OPEN_BROWSER='false')
+    url = f'http://127.0.0.1:{port}/api/health'
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env, cwd=BASE_DIR,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = start + timeout
+    healthy = ready = None
+    try:
+        while ready is None:
+            body = poll_health(url, deadline)
+            now = time.perf_counter()
+            if body is not None:
+                if healthy is None:
+                    healthy = now - start
+                if body.get('catalog', 'ready') == 'ready':
+                    ready = now - start
+                    break
+            time.sleep(0.005)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return healthy, ready
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure run_app.py startup time')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--port', type=int, default=5077)
+    parser.add_argument('--budget-ms', type=float, default=1500,
+                        help='Maximum median time until /api/health answers')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--cmd', help='Command to launch (default: this Python + run_app.py)')
+    args = parser.parse_args()
+
+    cmd = shlex.split(args.cmd) if args.cmd else [sys.executable, os.path.join(BASE_DIR, 'run_app.py')]
+
+    healthy_times, ready_times = [], []
+    for i in range(args.runs):
+        healthy, ready = measure_once(cmd, args.port, args.timeout)
+        healthy_times.append(healthy * 1000)
+        ready_times.append(ready * 1000)
+        print(f"  #{i + 1}: /api/health {healthy * 1000:.0f} ms | katalog hazır {ready * 1000:.0f} ms")
+
+    median_healthy = statistics.median(healthy_times)
+    median_ready = statistics.median(ready_times)
+    print(f"\n⏱️  Medyan: /api/health {median_healthy:.0f} ms | katalog hazır {median_ready:.0f} ms "
+          f"(bütçe {args.budget_ms:.0f} ms)")
+    if median_healthy > args.budget_ms:
+        print("❌ Başlatma süresi bütçeyi aşıyor.")
+        sys.exit(1)
+    print("✅ Başlatma süresi bütçe içinde.")
+
+
+if __name__ == '__main__':
+    main()
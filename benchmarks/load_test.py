@@ -0,0 +1,196 @@
+"""
+Open-loop load generator for /api/assistant and /api/analyze
+
+Sends requests at a fixed target rate (independent of how fast the server
+answers) and reports achieved throughput, error counts and tail latency.
+Latency is measured from the scheduled send time, so queueing inside the
+generator is not hidden. Several rates can be stepped through to find the
+saturation point of a deployment.
+
+With --spawn, a mock LLM server (mock_llm_server.py) and the app are
+started locally with the OpenAI/Ollama URLs pointed at the mock, so the
+whole test runs offline.
+
+Usage:
+    python benchmarks/load_test.py --spawn --rps 5,10,20,40 --duration 20
+    python benchmarks/load_test.py --url http://localhost:5000 --rps 10 --mix assistant=1
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from bench_api import MESSAGES, percentile
+
+
+def parse_mix(text):
+    """'assistant=0.7,analyze=0.3' -> [('assistant', 0.7), ('analyze', 0.3)]"""
+    mix = []
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in ('assistant', 'analyze'):
+            raise ValueError(f"Unknown endpoint in mix: {name}")
+        mix.append((name.strip(), float(weight or 1)))
+    return mix
+
+def make_request(base_url, endpoint, rng, id_range):
+    if endpoint == 'assistant':
+        body = json.dumps({'message': rng.choice(MESSAGES)}).encode('utf-8')
+        return urllib.request.Request(f'{base_url}/api/assistant', data=body,
+                                      headers={'Content-Type': 'application/json'})
+    car_id = rng.randint(*id_range)
+    return urllib.request.Request(f'{base_url}/api/analyze/{car_id}')
+
+def send(req, timeout):
+    """(status, degraded) where degraded means the app answered without the LLM"""
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            return resp.status, bool(resp.headers.get('X-LLM-Degraded'))
+    except urllib.error.HTTPError as e:
+        return e.code, False
+    except Exception:
+        return 0, False  # connection error / timeout
+
+def run_step(base_url, rps, duration, mix, id_range, timeout, max_in_flight, seed):
+    """Runs one fixed-rate step and returns its summary"""
+    rng = random.Random(seed)
+    names = [m[0] for m in mix]
+    weights = [m[1] for m in mix]
+    results = {name: [] for name in names}
+    statuses = {}
+    lock = threading.Lock()
+
+    def worker(endpoint, req, scheduled):
+        status, degraded = send(req, timeout)
+        latency = time.perf_counter() - scheduled
+        with lock:
+            results[endpoint].append((latency, status, degraded))
+            statuses[status] = statuses.get(status, 0) + 1
+
+    total = int(rps * duration)
+    interval = 1.0 / rps
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        for i in range(total):
+            scheduled = start + i * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            endpoint = rng.choices(names, weights)[0]
+            pool.submit(worker, endpoint, make_request(base_url, endpoint, rng, id_range), scheduled)
+    elapsed = time.perf_counter() - start
+
+    summary = {'target_rps': rps, 'sent': total, 'elapsed_s': elapsed, 'statuses': statuses, 'endpoints': {}}
+    for endpoint, samples in results.items():
+        ok = sorted(lat for lat, status, _ in samples if status == 200)
+        summary['endpoints'][endpoint] = {
+            'requests': len(samples),
+            'errors': sum(1 for _, status, _ in samples if status != 200),
+            'degraded': sum(1 for _, _, degraded in samples if degraded),
+            'achieved_rps': len(ok) / elapsed if elapsed else 0.0,
+            'p50_ms': percentile(ok, 50) * 1000,
+            'p95_ms': percentile(ok, 95) * 1000,
+            'p99_ms': percentile(ok, 99) * 1000,
+        }
+    return summary
+
+def print_step(summary):
+    print(f"\n🎯 Hedef {summary['target_rps']} req/s | {summary['sent']} istek | {summary['elapsed_s']:.1f}s"
+          f" | durum kodları {summary['statuses']}")
+    print(f"  {'endpoint':<12}{'n':>6}{'hata':>6}{'llm-siz':>9}{'req/s':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for endpoint, r in summary['endpoints'].items():
+        print(f"  {endpoint:<12}{r['requests']:>6}{r['errors']:>6}{r['degraded']:>9}{r['achieved_rps']:>8.1f}"
+              f"{r['p50_ms']:>10.0f}{r['p95_ms']:>10.0f}{r['p99_ms']:>10.0f}")
+
+def wait_for(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=2):
+                return True
+        except Exception:
+            time.sleep(0.2)
+    return False
+
+def spawn_stack(app_port, mock_port, mock_args, app_cmd=None):
+    """Starts the mock LLM server and the app; returns the processes"""
+    mock = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, 'mock_llm_server.py'),
+                             '--port', str(mock_port)] + mock_args)
+    env = dict(os.environ,
+               PORT=str(app_port), HOST='127.0.0.1', OPEN_BROWSER='false',
+               OPENAI_API_KEY='mock', OPENAI_BASE_URL=f'http://127.0.0.1:{mock_port}/v1',
+               OLLAMA_URL=f'http://127.0.0.1:{mock_port}/api/generate',
+               # All load comes from one address; per-client limits are off unless asked for
+               RATE_LIMIT_PER_MIN=os.environ.get('RATE_LIMIT_PER_MIN', '0'))
+    app = subprocess.Popen(app_cmd or [sys.executable, os.path.join(BASE_DIR, 'run_app.py')],
+                           env=env, cwd=BASE_DIR, stdout=subprocess.DEVNULL)
+    if not (wait_for(f'http://127.0.0.1:{mock_port}/health') and
+            wait_for(f'http://127.0.0.1:{app_port}/api/health')):
+        for p in (app, mock):
+            p.terminate()
+        raise SystemExit("❌ Mock LLM sunucusu veya uygulama başlatılamadı.")
+    return [app, mock]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fixed-rate load test for the LLM-backed endpoints')
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='App base URL (ignored with --spawn)')
+    parser.add_argument('--rps', default='5,10,20', help='Comma separated target rates, stepped in order')
+    parser.add_argument('--duration', type=float, default=15, help='Seconds per step')
+    parser.add_argument('--mix', default='assistant=0.7,analyze=0.3', help='Endpoint weights')
+    parser.add_argument('--ids', default='1-10000', help='Car id range for /api/analyze')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--max-in-flight', type=int, default=256, help='Client-side concurrency cap')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--spawn', action='store_true', help='Start mock LLM + app locally (offline)')
+    parser.add_argument('--app-port', type=int, default=5055)
+    parser.add_argument('--mock-port', type=int, default=8089)
+    parser.add_argument('--mock-latency', default='0.8')
+    parser.add_argument('--mock-jitter', default='0.3')
+    parser.add_argument('--mock-error-rate', default='0.0')
+    args = parser.parse_args()
+
+    lo, _, hi = args.ids.partition('-')
+    id_range = (int(lo), int(hi or lo))
+    mix = parse_mix(args.mix)
+
+    procs = []
+    base_url = args.url.rstrip('/')
+    if args.spawn:
+        procs = spawn_stack(args.app_port, args.mock_port,
+                            ['--latency', args.mock_latency, '--jitter', args.mock_jitter,
+                             '--error-rate', args.mock_error_rate])
+        base_url = f'http://127.0.0.1:{args.app_port}'
+
+    steps = []
+    try:
+        for i, rps in enumerate(float(r) for r in args.rps.split(',') if r.strip()):
+            summary = run_step(base_url, rps, args.duration, mix, id_range,
+                               args.timeout, args.max_in_flight, args.seed + i)
+            print_step(summary)
+            steps.append(summary)
+    finally:
+        for p in procs:
+            p.terminate()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(steps, f, indent=2)
+        print(f"\n✅ Sonuçlar kaydedildi: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
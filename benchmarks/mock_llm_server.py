@@ -0,0 +1,220 @@
+"""
+Local OpenAI / Ollama stand-in for load tests
+
+Serves the two LLM APIs the app talks to, with configurable latency,
+streaming and error rates, so the real endpoints can be loaded offline:
+
+    POST /v1/chat/completions   (OpenAI; "stream": true -> SSE chunks)
+    POST /api/generate          (Ollama; "stream": true -> NDJSON lines)
+    GET  /health
+
+Point the app at it with:
+    OPENAI_API_KEY=mock OPENAI_BASE_URL=http://127.0.0.1:8089/v1
+    OLLAMA_URL=http://127.0.0.1:8089/api/generate
+
+Usage:
+    python benchmarks/mock_llm_server.py --port 8089 --latency 0.8 --jitter 0.3 --error-rate 0.02
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_REPLY = (
+    "1. İsteği Özetle: Bütçenize ve tercihlerinize uygun araçlar listelendi. "
+    "2. En İyi Seçenekler: Fiyat/performans açısından öne çıkan araçları inceleyin. "
+    "3. Karşılaştırma: Kilometre ve model yılı dengesine dikkat edin. "
+    "5. Tavsiye: Ekspertiz raporu almadan karar vermeyin."
+)
+
+
+class MockConfig:
+    def __init__(self, latency=0.5, jitter=0.0, error_rate=0.0, chunk_delay=0.02,
+                 words_per_chunk=3, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.chunk_delay = chunk_delay
+        self.words_per_chunk = words_per_chunk
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def next_delay(self):
+        with self._lock:
+            return max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+
+    def should_fail(self):
+        with self._lock:
+            self.requests += 1
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            return fail
+
+
+def _chunks(text, words_per_chunk):
+    words = text.split(' ')
+    for i in range(0, len(words), words_per_chunk):
+        piece = ' '.join(words[i:i + words_per_chunk])
+        yield piece if i == 0 else ' ' + piece
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    config = MockConfig()
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass  # keep load tests quiet
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return {}
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_stream(self, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+    def _write_chunk(self, data):
+        raw = data.encode('utf-8')
+        self.wfile.write(f'{len(raw):x}\r\n'.encode() + raw + b'\r\n')
+        self.wfile.flush()
+
+    def _end_stream(self):
+        self.wfile.write(b'0\r\n\r\n')
+        self.wfile.flush()
+
+    def _fail(self, openai_style):
+        status = random.choice([429, 500, 503])
+        if openai_style:
+            self._send_json(status, {'error': {'message': 'mock failure', 'type': 'server_error', 'code': status}})
+        else:
+            self._send_json(status, {'error': 'mock failure'})
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/health':
+            cfg = self.config
+            self._send_json(200, {'status': 'ok', 'requests': cfg.requests, 'errors': cfg.errors})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        path = self.path.split('?')[0].rstrip('/')
+        if path.endswith('/chat/completions'):
+            self._openai_chat(self._read_json())
+        elif path == '/api/generate':
+            self._ollama_generate(self._read_json())
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def _openai_chat(self, body):
+        cfg = self.config
+        time.sleep(cfg.next_delay())
+        if cfg.should_fail():
+            return self._fail(openai_style=True)
+
+        model = body.get('model', 'gpt-4o')
+        completion_id = f'chatcmpl-{uuid.uuid4().hex[:24]}'
+        created = int(time.time())
+        prompt_tokens = sum(len(str(m.get('content', ''))) for m in body.get('messages', [])) // 4
+        completion_tokens = len(CANNED_REPLY) // 4
+
+        if body.get('stream'):
+            self._start_stream('text/event-stream')
+            for piece in _chunks(CANNED_REPLY, cfg.words_per_chunk):
+                chunk = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': created,
+                         'model': model, 'choices': [{'index': 0, 'delta': {'content': piece}, 'finish_reason': None}]}
+                self._write_chunk(f'data: {json.dumps(chunk, ensure_ascii=False)}\n\n')
+                time.sleep(cfg.chunk_delay)
+            final = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': created,
+                     'model': model, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]}
+            self._write_chunk(f'data: {json.dumps(final)}\n\n')
+            self._write_chunk('data: [DONE]\n\n')
+            return self._end_stream()
+
+        self._send_json(200, {
+            'id': completion_id,
+            'object': 'chat.completion',
+            'created': created,
+            'model': model,
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': CANNED_REPLY},
+                         'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens},
+        })
+
+    def _ollama_generate(self, body):
+        cfg = self.config
+        time.sleep(cfg.next_delay())
+        if cfg.should_fail():
+            return self._fail(openai_style=False)
+
+        model = body.get('model', 'llama3.2')
+        prompt_tokens = len(str(body.get('prompt', ''))) // 4
+        eval_count = len(CANNED_REPLY) // 4
+
+        if body.get('stream', True):
+            self._start_stream('application/x-ndjson')
+            for piece in _chunks(CANNED_REPLY, cfg.words_per_chunk):
+                self._write_chunk(json.dumps({'model': model, 'response': piece, 'done': False},
+                                             ensure_ascii=False) + '\n')
+                time.sleep(cfg.chunk_delay)
+            self._write_chunk(json.dumps({'model': model, 'response': '', 'done': True,
+                                          'prompt_eval_count': prompt_tokens, 'eval_count': eval_count}) + '\n')
+            return self._end_stream()
+
+        self._send_json(200, {
+            'model': model,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'response': CANNED_REPLY,
+            'done': True,
+            'prompt_eval_count': prompt_tokens,
+            'eval_count': eval_count,
+        })
+
+
+def make_server(host='127.0.0.1', port=8089, config=None):
+    """Builds a threaded mock server; call serve_forever() (or run it in a thread)"""
+    handler = type('ConfiguredMockLLMHandler', (MockLLMHandler,), {'config': config or MockConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mock OpenAI/Ollama server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.5, help='Mean response latency (s)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Uniform +/- jitter on latency (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 429/5xx')
+    parser.add_argument('--chunk-delay', type=float, default=0.02, help='Delay between streamed chunks (s)')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    config = MockConfig(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        chunk_delay=args.chunk_delay, seed=args.seed)
+    server = make_server(args.host, args.port, config)
+    print(f"🤖 Mock LLM server: http://{args.host}:{args.port} "
+          f"(latency {args.latency}s ±{args.jitter}, error rate {args.error_rate:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,39 @@
+"""
+In-process stand-in for the OpenAI client used by the benchmarks
+
+Mimics the small part of the SDK that run_app.py calls
+(client.chat.completions.create) and returns a canned Turkish reply
+after an optional fixed delay, so no network or API key is needed.
+"""
+import time
+from types import SimpleNamespace
+
+CANNED_REPLY = (
+    "1. İsteği Özetle: Bütçenize ve tercihlerinize uygun araçlar listelendi.\n"
+    "2. En İyi Seçenekler: Listeden fiyat/performans açısından öne çıkanları inceleyin.\n"
+    "5. Tavsiye: Ekspertiz raporu almadan karar vermeyin."
+)
+
+
+class _Completions:
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+
+    def create(self, model=None, messages=None, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        prompt_chars = sum(len(m.get('content', '')) for m in messages or [])
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=CANNED_REPLY))],
+            usage=SimpleNamespace(prompt_tokens=prompt_chars // 4,
+                                  completion_tokens=len(CANNED_REPLY) // 4),
+        )
+
+
+class StubOpenAI:
+    """Drop-in for openai.OpenAI(...) in benchmarks"""
+
+    def __init__(self, latency=0.0):
+        self.chat = SimpleNamespace(completions=_Completions(latency))
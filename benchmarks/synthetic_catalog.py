@@ -0,0 +1,91 @@
+"""
+Synthetic catalogs for benchmarking
+
+Generates cars.json-shaped listings by re-sampling brands, models, cities,
+engines and colours from data/cars.json and randomizing year, price and km.
+Output is deterministic for a given size and seed.
+
+Usage:
+    python benchmarks/synthetic_catalog.py 100000 [--out path] [--seed 42]
+"""
+import argparse
+import json
+import os
+import random
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED_PATH = os.path.join(BASE_DIR, 'data', 'cars.json')
+CACHE_DIR = os.path.join(BASE_DIR, 'benchmarks', '.data')
+
+TITLE_SUFFIXES = ['', '', '', ' Sport', ' Turbo', ' Premium', ' Comfort', ' Elite']
+
+
+def format_thousands(value):
+    """3199538 -> '3.199.538' (Turkish thousands separator)"""
+    return f"{value:,}".replace(',', '.')
+
+def load_seed(path=SEED_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def generate(size, seed=42, seed_cars=None):
+    """Returns a list of `size` synthetic listings"""
+    rng = random.Random(seed)
+    seed_cars = seed_cars or load_seed()
+    cities = sorted(set(c['city'] for c in seed_cars))
+    colors = sorted(set(c['color'] for c in seed_cars))
+
+    cars = []
+    for i in range(1, size + 1):
+        base = seed_cars[rng.randrange(len(seed_cars))]
+        year = rng.randint(2015, 2024)
+        age = 2025 - year
+        km = max(0, int(rng.gauss(age * 17000, 12000)))
+        # Depreciate from the seed listing's price, with noise
+        base_price = int(str(base['price']).replace('TL', '').replace('.', '').strip() or 0)
+        price = int(base_price * (0.92 ** (age - 3)) * rng.uniform(0.75, 1.25))
+        price = max(150000, price // 1000 * 1000 + rng.randint(0, 999))
+
+        cars.append({
+            'id': str(i),
+            'title': f"{year} {base['brand']} {base['model']}{rng.choice(TITLE_SUFFIXES)}",
+            'brand': base['brand'],
+            'model': base['model'],
+            'year': str(year),
+            'price': f"{format_thousands(price)} TL",
+            'engine': base['engine'],
+            'transmission': base['transmission'],
+            'km': format_thousands(km),
+            'fuel': base['fuel'],
+            'color': rng.choice(colors),
+            'city': rng.choice(cities),
+            'image': base['image'],
+        })
+    return cars
+
+def ensure_catalog(size, seed=42, directory=CACHE_DIR):
+    """Path to a cached synthetic catalog of `size` listings, generating it if missing"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'cars_{size}_{seed}.json')
+    if not os.path.exists(path):
+        cars = generate(size, seed)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cars, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic cars.json')
+    parser.add_argument('size', type=int)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', help='Output file (default: benchmarks/.data/cars_<size>_<seed>.json)')
+    args = parser.parse_args()
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(generate(args.size, args.seed), f, ensure_ascii=False)
+        print(f"✅ {args.size} ilan yazıldı: {args.out}")
+    else:
+        print(f"✅ {ensure_catalog(args.size, args.seed)}")
@@ -1,32 +1,56 @@
 """
 EXE Builder Script
 PyInstaller ile EXE oluşturur
+
+Varsayılan olarak --onedir kullanılır: --onefile her açılışta tüm paketi
+geçici bir klasöre açtığı için başlatma süresini uzatır. Tek dosya
+istenirse: python build_exe.py --onefile
 """
 import PyInstaller.__main__
 import os
+import sys
 
 # Proje dizini
 base_dir = os.path.dirname(os.path.abspath(__file__))
 
+onefile = '--onefile' in sys.argv[1:]
+
+def data(src, dest):
+    return f'--add-data={os.path.join(base_dir, src)}{os.pathsep}{dest}'
+
 PyInstaller.__main__.run([
     'run_app.py',
     '--name=AracimSaglam',
-    '--onefile',
+    '--onefile' if onefile else '--onedir',
     '--windowed',
     '--icon=NONE',
-    f'--add-data={os.path.join(base_dir, "website", "templates")};website/templates',
-    f'--add-data={os.path.join(base_dir, "website", "static")};website/static',
-    f'--add-data={os.path.join(base_dir, "data")};data',
-    f'--add-data={os.path.join(base_dir, "agent")};agent',
+    data(os.path.join('website', 'templates'), 'website/templates'),
+    data(os.path.join('website', 'static'), 'website/static'),
+    data('frontend', 'frontend'),
+    data('data', 'data'),
+    data('agent', 'agent'),
+    # run_app.py imports these through sys.path at runtime
+    f'--paths={os.path.join(base_dir, "agent")}',
+    f'--paths={os.path.join(base_dir, "website")}',
     '--hidden-import=flask',
     '--hidden-import=jinja2',
     '--hidden-import=werkzeug',
+    '--hidden-import=openai',
     '--collect-all=flask',
     '--collect-all=jinja2',
+    # Scraper/dev-only packages are not needed by the web app
+    '--exclude-module=selenium',
+    '--exclude-module=webdriver_manager',
+    '--exclude-module=anthropic',
+    '--exclude-module=tkinter',
+    '--exclude-module=pytest',
     '--noconfirm',
 ])
 
 print("\n" + "="*50)
 print("✅ EXE oluşturuldu!")
-print("📁 Konum: dist/AracimSaglam.exe")
+if onefile:
+    print("📁 Konum: dist/AracimSaglam.exe")
+else:
+    print("📁 Konum: dist/AracimSaglam/AracimSaglam.exe")
 print("="*50)
@@ -0,0 +1,81 @@
+"""
+AracımSağlam - Production gunicorn profile
+
+    gunicorn -c gunicorn.conf.py run_app:app
+
+(gunicorn also picks this file up automatically when started from the
+project root.)
+
+- The app and the catalog are loaded once in the master before forking
+  (preload_app), so workers share the parsed cars.json copy-on-write.
+- Workers are threaded: most request time is spent waiting on OpenAI, so
+  threads rather than processes carry the concurrency.
+- The master watches cars.json; on change it re-parses the catalog and
+  sends itself SIGHUP, which gracefully replaces the workers with fresh
+  forks that inherit the new data.
+"""
+import gc
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '5000')}"
+
+preload_app = True
+
+# gthread (default) or gevent (requires `pip install gevent`)
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 4)))
+# LLM-bound requests mostly wait on the network, so each worker holds many
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 200))  # gevent only
+
+# OpenAI calls can take tens of seconds
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+# Seconds between cars.json checks in the master; 0 disables the watcher
+catalog_watch_interval = float(os.environ.get('CATALOG_WATCH_INTERVAL', 5))
+
+
+def _app_module():
+    import run_app
+    return run_app
+
+def _watch_catalog(server, interval):
+    """Master-side loop: reload the catalog and roll the workers when cars.json changes"""
+    catalog = _app_module().catalog
+    while True:
+        time.sleep(interval)
+        try:
+            before = catalog.current()
+            snapshot = catalog.refresh()
+            if snapshot is before:
+                continue
+            _app_module().warm_up()
+            gc.freeze()
+            server.log.info("cars.json changed (version %s), reloading workers", snapshot.version)
+            os.kill(os.getpid(), signal.SIGHUP)
+        except Exception as e:
+            server.log.error("Catalog watcher error: %s", e)
+
+
+def when_ready(server):
+    # Runs in the master after preload: parse the catalog before the first fork
+    _app_module().warm_up()
+    # Keep the shared objects out of future GC passes so workers don't dirty their pages
+    gc.freeze()
+
+    if catalog_watch_interval > 0 and not any(t.name == 'catalog-watcher' for t in threading.enumerate()):
+        threading.Thread(target=_watch_catalog, args=(server, catalog_watch_interval),
+                         name='catalog-watcher', daemon=True).start()
+
+def post_fork(server, worker):
+    # Workers keep the inherited snapshot; the master decides when data changes
+    _app_module().catalog.auto_reload = False
@@ -1,11 +1,16 @@
 """
 AracımSağlam - Web Application Runner
 """
+import time
+STARTUP_T0 = time.perf_counter()
+
 import os
 import sys
 import webbrowser
 import socket
-from threading import Timer
+from threading import Timer, Lock, Thread
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -21,13 +26,17 @@ else:
 sys.path.insert(0, os.path.join(base_path, 'website'))
 sys.path.insert(0, os.path.join(base_path, 'agent'))
 
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_from_directory, send_file, redirect, url_for, g, Response, has_request_context
 from flask_cors import CORS
-from car_agent import CarAgent
-import json
-from openai import OpenAI
-
-import re
+from car_catalog import get_catalog, turkish_lower, clean_price, clean_km, clean_year
+from assistant import find_matches, build_messages, local_reply, session_state
+from sessions import SessionStore, new_session_id, valid_session_id
+import metrics
+from metrics import span
+from image_cache import ThumbnailCache, image_version
+import pricing
+import facets
+from rate_limit import make_limiter, AdmissionGate, forwarded_client
 
 # Initialize Flask app
 app = Flask(__name__, 
@@ -35,59 +44,228 @@ app = Flask(__name__,
             static_folder=os.path.join(base_path, 'website', 'static'))
 
 # Enable CORS
+# Comma separated list of allowed origins, e.g. https://aracimsaglam.netlify.app
 cors_origin = os.environ.get('FRONTEND_ORIGIN', '*')
-CORS(app, resources={r"/api/*": {"origins": "*"}})
+CORS(app, resources={r"/api/*": {"origins": [o.strip() for o in cors_origin.split(',')] if cors_origin != '*' else "*"}})
 
-# Initialize Agent
-agent = CarAgent()
+# Shared catalog (also used by CarAgent). Parsed on first use or by warm_up().
+catalog = get_catalog(os.environ.get('CARS_PATH') or os.path.join(base_path, 'data', 'cars.json'))
 
-# Initialize OpenAI Client
-api_key = os.environ.get("OPENAI_API_KEY")
+# OpenAI Client, created on the first assistant/analyze call
 client = None
-if api_key:
-    client = OpenAI(api_key=api_key)
+_client_ready = False
+_client_lock = Lock()
+
+def get_client():
+    """Lazily imports openai and builds the client (None without OPENAI_API_KEY)"""
+    global client, _client_ready
+    if not _client_ready:
+        with _client_lock:
+            if not _client_ready:
+                api_key = os.environ.get("OPENAI_API_KEY")
+                # A client assigned from outside (tests, benchmarks) is kept
+                if api_key and client is None:
+                    from openai import OpenAI
+                    client = OpenAI(api_key=api_key)
+                _client_ready = True
+    return client
+
+# LLM admission control: per-client token buckets and a bound on calls in flight.
+# Refused requests get the local (heuristic) reply instead of waiting.
+RATE_LIMIT_PER_MIN = int(os.environ.get('RATE_LIMIT_PER_MIN', 20))
+RATE_LIMIT_BURST = int(os.environ.get('RATE_LIMIT_BURST', 5))
+LLM_MAX_IN_FLIGHT = int(os.environ.get('LLM_MAX_IN_FLIGHT', 16))
+# Behind cloudflared / a reverse proxy the client address comes from headers.
+# Only CLIENT_IP_HEADER is read (set by the proxy); for X-Forwarded-For the
+# entry PROXY_HOPS from the right, i.e. the one our own proxy appended.
+TRUST_PROXY = os.environ.get('TRUST_PROXY', 'false').lower() == 'true'
+CLIENT_IP_HEADER = os.environ.get('CLIENT_IP_HEADER', 'CF-Connecting-IP')
+PROXY_HOPS = int(os.environ.get('PROXY_HOPS', 1))
+
+limiter = make_limiter(RATE_LIMIT_PER_MIN, RATE_LIMIT_BURST, os.environ.get('RATE_LIMIT_REDIS_URL'))
+llm_gate = AdmissionGate(LLM_MAX_IN_FLIGHT)
+
+# Assistant conversations (criteria and results of the previous messages).
+# SESSION_DB (SQLite file) keeps them across restarts and workers.
+session_store = SessionStore(int(os.environ.get('SESSION_MAX', 10000)),
+                             int(os.environ.get('SESSION_TTL', 30 * 60)),
+                             os.environ.get('SESSION_DB'))
+
+def get_session(session_id):
+    """(session id, previous state or None); unknown or invalid ids start a new session"""
+    if not valid_session_id(session_id):
+        return new_session_id(), None
+    previous = session_store.get(session_id)
+    if previous is None:
+        # Only ids we issued are kept; a client can't pick (or revive) one
+        return new_session_id(), None
+    return session_id, previous
+
+def client_ip(headers=None, remote_addr=None):
+    """Client address the rate limit is keyed on (the current Flask request by default)"""
+    if headers is None:
+        headers, remote_addr = request.headers, request.remote_addr
+    if TRUST_PROXY:
+        # Flask headers are case-insensitive, the ASGI app passes lower-cased names
+        forwarded = forwarded_client(headers.get(CLIENT_IP_HEADER.lower()), CLIENT_IP_HEADER, PROXY_HOPS)
+        if forwarded:
+            return forwarded
+    return remote_addr or 'unknown'
+
+def llm_admission(route, gate=None, headers=None, remote_addr=None):
+    """Decides an LLM call: 'admitted', 'rate_limited' or 'shed'.
+
+    Spends one token of the client's budget for the route, then takes a
+    slot of gate (llm_gate by default) without waiting; when admitted the
+    caller must release it. Shared by the Flask views and asgi_app.py.
+    """
+    if limiter is not None and not limiter.allow(f'{route}:{client_ip(headers, remote_addr)}'):
+        decision = 'rate_limited'
+    elif not (gate or llm_gate).try_acquire():
+        decision = 'shed'
+    else:
+        decision = 'admitted'
+    metrics.LLM_ADMISSIONS.inc(route=route, decision=decision)
+    if decision != 'admitted' and has_request_context():
+        g.llm_degraded = decision
+    return decision
+
+def admit_llm(route):
+    """True if this request may call the LLM now (release llm_gate afterwards)"""
+    return llm_admission(route) == 'admitted'
 
 def load_cars():
-    try:
-        cars_path = os.path.join(base_path, 'data', 'cars.json')
-        with open(cars_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return []
-
-# Helper Functions
-def turkish_lower(text):
-    """Robust lowercase for Turkish characters I/İ"""
-    if not text: return ""
-    # Map specifically problematic characters first
-    text = text.replace('İ', 'i').replace('I', 'ı')
-    return text.lower()
-
-def clean_price(price_str):
-    if not price_str: return 0
-    # Remove TL, space, dots
-    clean = str(price_str).replace('TL', '').replace('.', '').replace(',', '').strip()
-    try:
-        return int(clean)
-    except:
-        return 0
-
-def clean_km(km_str):
-    if not km_str: return 0
-    clean = str(km_str).replace('.', '').replace(',', '').strip()
-    try:
-        return int(clean)
-    except:
-        return 0
+    return catalog.cars
+
+# Catalog metrics are read from the shared catalog at scrape time
+metrics.gauge('aracimsaglam_catalog_reloads_total', 'Number of times cars.json was parsed',
+              lambda: catalog.reload_count, kind='counter')
+metrics.gauge('aracimsaglam_catalog_version', 'Version of the loaded catalog',
+              lambda: catalog.current().version if catalog.current() else 0)
+metrics.gauge('aracimsaglam_catalog_cars', 'Number of cars in the loaded catalog',
+              lambda: len(catalog.current().cars) if catalog.current() else 0)
+metrics.gauge('aracimsaglam_llm_in_flight', 'LLM calls currently in flight', lambda: llm_gate.in_flight)
+metrics.gauge('aracimsaglam_assistant_sessions', 'Assistant sessions held in memory', lambda: len(session_store))
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    start = g.get('request_start')
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - start, route=route,
+                                        method=request.method, status=response.status_code)
+    degraded = g.get('llm_degraded')
+    if degraded:
+        # Tells clients (and load tests) the reply skipped the LLM
+        response.headers['X-LLM-Degraded'] = degraded
+    return response
+
+# Home page: rendered HTML is cached per catalog version and page
+INDEX_PAGE_SIZE = 20
+INDEX_CACHED_PAGES = int(os.environ.get('INDEX_CACHED_PAGES', 10))
+INDEX_MAX_AGE = int(os.environ.get('INDEX_MAX_AGE', 60))
+
+_app_version = None
+
+def app_version():
+    """Short hash of the code and templates that render pages (APP_VERSION overrides).
+
+    Part of the page ETags, so a deploy invalidates HTML cached by browsers
+    even when cars.json didn't change.
+    """
+    global _app_version
+    if _app_version is None:
+        version = os.environ.get('APP_VERSION')
+        if not version:
+            import hashlib
+            digest = hashlib.sha1()
+            template_dir = app.template_folder
+            files = [os.path.abspath(__file__)] + sorted(
+                os.path.join(template_dir, name) for name in os.listdir(template_dir))
+            for path in files:
+                try:
+                    with open(path, 'rb') as f:
+                        digest.update(f.read())
+                except OSError:
+                    pass
+            version = digest.hexdigest()[:10]
+        _app_version = version
+    return _app_version
+
+def render_index_page(snapshot, page):
+    start = (page - 1) * INDEX_PAGE_SIZE
+    return render_template('index.html', cars=snapshot.cars[start:start + INDEX_PAGE_SIZE]).encode('utf-8')
 
 @app.route('/')
 def index():
-    cars = load_cars()
-    return render_template('index.html', cars=cars[:20])
-
-@app.route('/api/health')
-def health_check():
-    return jsonify({"status": "ok"})
+    page = max(1, request.args.get('page', 1, type=int))
+    snapshot = catalog.snapshot()
+    
+    # Only the first pages are kept in memory; deep pages are rendered on demand
+    if page <= INDEX_CACHED_PAGES:
+        key = ('index_html', page)
+        body = snapshot.peek(key)
+        metrics.record_cache('index_html', body is not None)
+        if body is None:
+            body = snapshot.memo(key, lambda: render_index_page(snapshot, page))
+    else:
+        body = render_index_page(snapshot, page)
+    
+    response = Response(body, mimetype='text/html')
+    response.set_etag(f'index-{app_version()}-{snapshot.etag}-{page}')
+    response.cache_control.public = True
+    response.cache_control.max_age = INDEX_MAX_AGE
+    return response.make_conditional(request)
+
+# Listing photo proxy with on-disk thumbnail cache
+IMAGE_CACHE_DIR = os.environ.get('IMAGE_CACHE_DIR') or os.path.join(base_path, 'cache', 'thumbs')
+IMAGE_CACHE_MAX_MB = int(os.environ.get('IMAGE_CACHE_MAX_MB', 200))
+thumbnails = None
+_thumbnails_lock = Lock()
+
+def get_thumbnails():
+    global thumbnails
+    if thumbnails is None:
+        with _thumbnails_lock:
+            if thumbnails is None:
+                thumbnails = ThumbnailCache(IMAGE_CACHE_DIR, max_bytes=IMAGE_CACHE_MAX_MB * 1024 * 1024)
+    return thumbnails
+
+@app.template_global()
+def thumbnail_url(car):
+    """Versioned /img URL for a car, safe to cache forever"""
+    return url_for('car_image', car_id=car.get('id'), v=image_version(car.get('image')))
+
+@app.route('/img/<car_id>')
+def car_image(car_id):
+    car = catalog.snapshot().get(car_id)
+    if not car or not car.get('image'):
+        return jsonify({'error': "Görsel bulunamadı."}), 404
+    image = car['image']
+    
+    # Only a URL carrying the current image hash may be cached forever
+    immutable = request.args.get('v') == image_version(image)
+    try:
+        path, mimetype, hit = get_thumbnails().get(image)
+        # Another worker may evict the file at any time
+        response = send_file(path, mimetype=mimetype, max_age=31536000 if immutable else 3600)
+    except Exception as e:
+        print(f"Image proxy error for {car_id}: {e}")
+        # Let the browser try the original source
+        return redirect(image, code=302)
+    metrics.record_cache('thumbnail', hit)
+    
+    if immutable:
+        response.cache_control.immutable = True
+    response.cache_control.public = True
+    # Proxied SVGs must not run scripts on our origin
+    response.headers['Content-Security-Policy'] = "default-src 'none'; style-src 'unsafe-inline'; sandbox"
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
 
 @app.route('/ai.html')
 def ai_page():
@@ -106,272 +284,53 @@ def assistant():
     data = request.get_json(silent=True) or {}
     # Use turkish_lower for user message
     user_msg = turkish_lower(data.get('message', ''))
-    cars = load_cars()
-    
-    # --- 1. Robust Intent Parsing ---
-    criteria = {
-        'budget_max': None,
-        'budget_min': None,
-        'brands': [],
-        'cities': [],
-        'fuels': [],
-        'year_min': None,
-        'year_max': None,
-        'transmissions': [],
-        'sort': 'default' # default, price_asc, km_asc, best
-    }
-    
-    # A. Brands (Exact match from dataset)
-    all_brands = set(c.get('brand', '').lower() for c in cars)
-    for b in all_brands:
-        # Check strict word match to avoid partials inside other words
-        if re.search(r'\b' + re.escape(b) + r'\b', user_msg):
-            criteria['brands'].append(b)
-
-    # B. Cities (Suffix handling: istanbulda -> istanbul)
-    # B. Cities (Suffix handling: istanbulda -> istanbul)
-    # Norm city names for comparison
-    all_cities = set(turkish_lower(c.get('city', '')) for c in cars)
-    for city in all_cities:
-        # Regex to match city followed by common Turkish suffixes or boundary
-        # Suffixes: da, de, da, 'da, 'de, da'ki... simplify: check if city is prefix of a word
-        # "istanbulda" -> startswith "istanbul"
-        # We scan words in user_msg
-        for word in user_msg.split():
-            # Remove punctuation for check
-            clean_word = re.sub(r'[^\w\s]', '', word) 
-            if clean_word.startswith(city):
-                 # Verification: is the rest a suffix?
-                 suffix = clean_word[len(city):]
-                 if suffix in ['', 'da', 'de', 'ta', 'te', 'dan', 'den', 'tan', 'ten', 'daki', 'deki']:
-                     criteria['cities'].append(city)
-                     break
-    
-    # C. Fuel
-    fuel_map = {
-        'benzin': ['benzin'],
-        'dizel': ['dizel'],
-        'motorin': ['dizel'], # alias
-        'hibrit': ['hybrid', 'hibrit'],
-        'elektrik': ['elektrik'],
-        'lpg': ['lpg']
-    }
-    for key, values in fuel_map.items():
-        if key in user_msg:
-            criteria['fuels'].extend(values)
-
-    # D. Transmission
-    if 'otomatik' in user_msg:
-        criteria['transmissions'].extend(['otomatik', 'yarı otomatik', 'dct', 'cvt', 'pdk', 'dsg', 'triptonik'])
-    if 'manuel' in user_msg:
-        criteria['transmissions'].append('manuel')
-
-    # E. Year
-    # "2018 ve üstü", "2018 üzeri"
-    year_min_match = re.search(r'(\d{4})\s*(ve\s*)?(üstü|üzeri|sonrası)', user_msg)
-    if year_min_match:
-        criteria['year_min'] = int(year_min_match.group(1))
-    
-    # Range: "2015-2020", "2015 ile 2020"
-    year_range_match = re.search(r'(\d{4})\s*[-ile]\s*(\d{4})', user_msg)
-    if year_range_match:
-        y1, y2 = int(year_range_match.group(1)), int(year_range_match.group(2))
-        criteria['year_min'] = min(y1, y2)
-        criteria['year_max'] = max(y1, y2)
-        
-    # F. Budget
-    # Normalizers
-    def parse_money_token(token):
-        token = token.replace(',', '.')
-        mult = 1
-        if 'm' in token or 'milyon' in token: mult = 1000000
-        elif 'k' in token or 'bin' in token: mult = 1000
-        # clean nums
-        nums = re.findall(r'\d+(?:[.]\d+)?', token)
-        if not nums: return None
-        val = float(nums[0])
-        # specialized logic: if val < 1000 and mult==1 => probably implied 'bin' if user says "500-600 arası" ? 
-        # But risky. Let's stick to explicit.
-        # However, "500k" -> 500 * 1000
-        return int(val * mult)
-
-    # Max budget: "2m altı", "500.000 tl altı"
-    max_budget_match = re.search(r'(\d+(?:[.,]\d+)?\s*(?:m|k|bin|milyon|tl)?)\s*(?:altı|altında)', user_msg)
-    if max_budget_match:
-        val = parse_money_token(max_budget_match.group(1))
-        if val and val > 1000: criteria['budget_max'] = val
-
-    # Range budget: "500 - 1000 arası", "500k - 1m"
-    # This is hard with regex alone, simple heuristic: find two money amounts
-    money_tokens = re.findall(r'\d+(?:[.,]\d+)?\s*(?:m|k|bin|milyon|tl)?', user_msg)
-    if len(money_tokens) >= 2 and ('arası' in user_msg or '-' in user_msg):
-        v1 = parse_money_token(money_tokens[0])
-        v2 = parse_money_token(money_tokens[1])
-        if v1 and v2 and v1 > 1000 and v2 > 1000:
-            criteria['budget_min'] = min(v1, v2)
-            criteria['budget_max'] = max(v1, v2)
-
-    # Sorting intent
-    if 'en ucuz' in user_msg or 'fiyatı düşük' in user_msg: criteria['sort'] = 'price_asc'
-    elif 'en az km' in user_msg or 'kilometresi düşük' in user_msg: criteria['sort'] = 'km_asc'
-    elif 'en iyi' in user_msg or 'öner' in user_msg: criteria['sort'] = 'best'
-
-    # --- 2. Filtering Logic ---
-    filtered_cars = []
-    
-    # If explicit city requested but none found, we might want to inform user.
-    # Currently we'll filter strictly if city matches.
-    
-    for car in cars:
-        c_brand = turkish_lower(car.get('brand', ''))
-        c_city = turkish_lower(car.get('city', ''))
-        c_fuel = turkish_lower(car.get('fuel', ''))
-        c_trans = turkish_lower(car.get('transmission', ''))
-        c_year = int(car.get('year', 0))
-        c_price = clean_price(car.get('price'))
-
-        # Strict Checks
-        if criteria['brands'] and not any(b == c_brand for b in criteria['brands']): continue
-        if criteria['cities'] and not any(c == c_city for c in criteria['cities']): continue
-        if criteria['fuels'] and not any(f in c_fuel for f in criteria['fuels']): continue
-        if criteria['transmissions'] and not any(t in c_trans for t in criteria['transmissions']): continue
-        
-        if criteria['year_min'] and c_year < criteria['year_min']: continue
-        if criteria['year_max'] and c_year > criteria['year_max']: continue
-        
-        if criteria['budget_max'] and c_price > criteria['budget_max']: continue
-        if criteria['budget_min'] and c_price < criteria['budget_min']: continue
-
-        filtered_cars.append(car)
-
-    # Fallback removed strictly as per requirements: 
-    # if city is specified, DO NOT return cars from other cities
-    hit_city_fallback = False
-
-    # --- 3. Sorting/Ranking ---
-    def get_sort_key(car):
-        p = clean_price(car.get('price'))
-        k = clean_km(car.get('km'))
-        y = int(car.get('year', 0))
-        
-        if criteria['sort'] == 'price_asc': return (p, k)
-        if criteria['sort'] == 'km_asc': return (k, p)
-        if criteria['sort'] == 'best': 
-            # Weighted score: low price, low km, high year
-            # Max price approx 10m, Max km 200k. Normalize roughly.
-            # Score = (Year * 5000) - (Price / 1000) - (KM / 10)
-            # This is heuristic.
-            return -((y * 5000) - (p / 200) - (k / 10))
-            
-        # Default: just budget compliance (already filtered) then price
-        return (p, k)
-
-    filtered_cars.sort(key=get_sort_key)
+    with span('assistant', 'load_cars'):
+        snapshot = catalog.snapshot()
     
-    # Top results
-    matches = filtered_cars[:6]
+    session_id, previous = get_session(data.get('session_id'))
+    criteria, filtered, matches = find_matches(snapshot, user_msg, previous=previous)
+    session_store.put(session_id, session_state(snapshot, user_msg, criteria, filtered, previous))
     
     # --- 4. Reply Generation ---
-    reply_text = ""
-    
     # Check if we have an OpenAI client and use it
-    if client:
+    client = get_client()
+    if client and admit_llm('assistant'):
         try:
-            # Prepare context for OpenAI
-            if not matches:
-                system_prompt = "Sen Türkçe konuşan yardımsever bir otomobil asistanısın. Kullanıcıya kriterlerine uygun araç bulunamadığını nazikçe söyle ve kriterlerini (şehir, bütçe vb) değiştirmesini öner."
-                user_content = f"Kullanıcı mesajı: '{user_msg}'. Hiç araç bulunamadı."
-            else:
-                system_prompt = """Sen Türkiye ikinci el araç piyasasında uzmanlaşmış, profesyonel bir otomobil danışmanısın.
-Görev: Kullanıcıyı sadece listemek değil, DOĞRU satın alma kararına yönlendirmek.
-Dinamikleri anlıyorsun: Fiyat/performans, segment beklentileri, yakıt/vites tercihleri, aile/genç kullanımı.
-
-KURALLAR:
-1. Sana filtrelenmiş bir araç listesi verilecek. ASLA bu liste dışında araç uydurma.
-2. Her aracın NEDEN uygun olduğunu veya olmadığını gerekçeleriyle açıkla.
-3. Eksi yönleri nazikçe ve şeffafça belirt.
-4. "En ucuz", "en az yakan" gibi fırsatları vurgula.
-5. Dil: Türkçe. Ton: Profesyonel, güven verici, satış odaklı ama asla agresif değil. Gerçek bir danışman gibi konuş."""
-                
-                # Compact car list
-                car_context = []
-                for m in matches:
-                    car_context.append(f"- {m['title']} ({m['year']}), {m['price']}, {m['km']} km, {m['city']}, {m['fuel']}, {m['transmission']}")
-                
-                car_list_str = "\n".join(car_context)
-                user_content = f"""Kullanıcı Mesajı: '{user_msg}'
-
-Bulunan Araçlar (Sadece bunlardan seç):
-{car_list_str}
-
-Lütfen şu formatta yanıt ver:
-1. İsteği Özetle: (Kullanıcı ne arıyor? Bütçe, şehir vb.)
-2. En İyi 3-5 Seçenek:
-   - [Araç Adı]: Kimin için uygun? Güçlü yönü ne? (Fiyat, Yakıt, Konfor vb.)
-3. Karşılaştırma: (Varsa benzer araçları kıyasla)
-4. Şehir ve Uygunluk: (Şehir dışı ise belirt)
-5. Tavsiye: Güven verici bir kapanış cümlesi.
-"""
-
-            completion = client.chat.completions.create(
-                model="gpt-4o", # or gpt-3.5-turbo
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_content}
-                ]
-            )
+            with span('assistant', 'llm'), metrics.time_llm('assistant', 'openai'):
+                completion = client.chat.completions.create(
+                    model="gpt-4o", # or gpt-3.5-turbo
+                    messages=build_messages(user_msg, matches, previous, criteria)
+                )
+            metrics.record_llm_usage('assistant', 'openai', getattr(completion, 'usage', None))
             reply_text = completion.choices[0].message.content
-            return jsonify({'reply': reply_text, 'matches': matches})
+            return jsonify({'reply': reply_text, 'matches': matches, 'session_id': session_id})
 
         except Exception as e:
             print(f"OpenAI Error: {e}")
             # Fallback will happen below
             pass
+        finally:
+            llm_gate.release()
 
     # LOCAL FALLBACK
-    reply_parts = []
-    
-    if not matches:
-        reply_parts.append("😔 Maalesef belirttiğiniz kriterlere uygun araç bulamadım.")
-        reply_parts.append("Kriterlerinizi (bütçe, yıl vb.) biraz esnetmeyi deneyebilirsiniz.")
-        return jsonify({'reply': "\n".join(reply_parts), 'matches': []})
-    
-    count = len(filtered_cars)
-    shown = len(matches)
-    
-    summary_adjs = []
-    if criteria['brands']: summary_adjs.append(f"{','.join(criteria['brands']).upper()}")
-    if criteria['year_min']: summary_adjs.append(f"{criteria['year_min']}+ model")
-    if criteria['budget_max']: summary_adjs.append(f"{criteria['budget_max']/1000:.0f}k TL altı")
-    
-    desc = " ".join(summary_adjs)
-    if not desc: desc = "uygun"
-    
-    reply_parts.append(f"🔍 Aradığınız kriterlere {desc} toplam {count} araç buldum.")
-    reply_parts.append(f"İşte en iyi {shown} tanesi:")
-    
-    bullet_list = []
-    for m in matches:
-        bullet_list.append(f"• {m.get('title')} ({m.get('price')})")
-        
-    reply_parts.append("\n".join(bullet_list))
-    
     return jsonify({
-        'reply': "\n\n".join(reply_parts),
-        'matches': matches
+        'reply': local_reply(criteria, filtered, matches),
+        'matches': matches,
+        'session_id': session_id
     })
 
-@app.route('/api/analyze/<car_id>')
-def analyze(car_id):
-    cars = load_cars()
-    car = next((c for c in cars if c['id'] == car_id), None)
-    if not car:
-        return jsonify({'analysis': "Araç bulunamadı."})
-        
-    # OpenAI Analysis
-    if client:
-        try:
-            prompt = f"""
+# Analysis cache: car_id -> LLM report for the current catalog version, LRU bounded
+ANALYSIS_CACHE_MAX = int(os.environ.get('ANALYSIS_CACHE_MAX', 1000))
+_analysis_cache = OrderedDict()
+_analysis_cache_version = None
+_analysis_cache_lock = Lock()
+
+# Batch analysis limits
+MAX_BATCH_IDS = int(os.environ.get('ANALYZE_BATCH_MAX', 10))
+ANALYZE_MAX_WORKERS = int(os.environ.get('ANALYZE_MAX_WORKERS', 4))
+
+def analysis_prompt(car):
+    return f"""
             Şu araba hakkında potansiyel alıcıya detaylı bir analiz raporu yaz:
             Araç: {car.get('title')}
             Fiyat: {car.get('price')}
@@ -405,25 +364,75 @@ def analyze(car_id):
 
             Ton: Samimi, gerçekçi, güven verici. "Robot" gibi değil, bir "uzman abi" gibi konuş.
             """
-            
+
+def llm_analysis(car, route='analyze'):
+    """Returns the OpenAI report for a car, or None if unavailable"""
+    client = get_client()
+    if not client or not admit_llm(route):
+        return None
+    return run_llm_analysis(client, car, route)
+
+def run_llm_analysis(client, car, route):
+    """OpenAI report for a car, or None; the caller holds an LLM slot, released here"""
+    try:
+        with metrics.time_llm(route, 'openai'):
             completion = client.chat.completions.create(
                 model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}]
+                messages=[{"role": "user", "content": analysis_prompt(car)}]
             )
-            return jsonify({'analysis': completion.choices[0].message.content})
-        except Exception as e:
-            print(f"OpenAI Error in analyze: {e}")
-            pass
-
-    # Heuristics for analysis (FALLBACK)
+        metrics.record_llm_usage(route, 'openai', getattr(completion, 'usage', None))
+        return completion.choices[0].message.content
+    except Exception as e:
+        print(f"OpenAI Error in analyze: {e}")
+        return None
+    finally:
+        llm_gate.release()
+
+def cached_analysis(version, car_id):
+    with _analysis_cache_lock:
+        text = _analysis_cache.get(car_id) if version == _analysis_cache_version else None
+        if text is not None:
+            _analysis_cache.move_to_end(car_id)
+    metrics.record_cache('analysis', text is not None)
+    return text
+
+def store_analysis(version, car_id, text):
+    global _analysis_cache_version
+    with _analysis_cache_lock:
+        # Reports of an older catalog version are dropped all at once
+        if version != _analysis_cache_version:
+            if _analysis_cache_version is not None and version < _analysis_cache_version:
+                return  # a request that started before a reload
+            _analysis_cache.clear()
+            _analysis_cache_version = version
+        _analysis_cache[car_id] = text
+        _analysis_cache.move_to_end(car_id)
+        while len(_analysis_cache) > ANALYSIS_CACHE_MAX:
+            _analysis_cache.popitem(last=False)
+
+def catalog_averages(snapshot):
+    """(avg_price, avg_km), computed once per catalog version"""
+    def compute():
+        rows = snapshot.rows
+        if not rows:
+            return 0, 0
+        return (sum(r['price'] for r in rows) / len(rows),
+                sum(r['km'] for r in rows) / len(rows))
+    return snapshot.memo('averages', compute)
+
+def heuristic_analysis(car, avg_price, avg_km):
+    """Rule based report used when the LLM is unavailable.
+
+    Uses the price model's expected_price / deal_score when the catalog has
+    been scored (pricing.score_catalog), otherwise the catalog averages.
+    """
     price = clean_price(car.get('price'))
+    expected = car.get('expected_price')
+    deal_score = car.get('deal_score')
     km = clean_km(car.get('km'))
-    year = int(car.get('year', 0))
-    fuel = car.get('fuel')
-    
-    # Averages (approx from typical DB)
-    avg_price = sum(clean_price(c.get('price')) for c in cars) / len(cars) if cars else 0
-    avg_km = sum(clean_km(c.get('km')) for c in cars) / len(cars) if cars else 0
+    year = clean_year(car.get('year'))
+    fuel = car.get('fuel') or ''
+    transmission = car.get('transmission') or ''
     
     pros = []
     cons = []
@@ -431,20 +440,30 @@ def analyze(car_id):
     if year >= 2022: pros.append("Model yılı çok yeni, güncel kasa.")
     if km < 30000: pros.append("Düşük kilometre, motor kondisyonu muhtemelen çok iyi.")
     if 'Hybrid' in fuel or 'Elektrik' in fuel: pros.append("Yakıt tüketimi ekonomik ve çevreci.")
-    if 'Otomatik' in car.get('transmission') or 'DCT' in car.get('transmission'): pros.append("Konforlu otomatik vites.")
+    if 'Otomatik' in transmission or 'DCT' in transmission: pros.append("Konforlu otomatik vites.")
     
-    if price > avg_price * 1.5: cons.append("Fiyatı piyasa ortalamasının üzerinde.")
+    if deal_score is not None:
+        if deal_score <= -pricing.DEAL_THRESHOLD: cons.append("Fiyatı benzer araçların beklenen fiyatının üzerinde.")
+    elif price > avg_price * 1.5: cons.append("Fiyatı piyasa ortalamasının üzerinde.")
     if year < 2018: cons.append("Model yılı biraz eski, donanımları kontrol edin.")
     if km > 150000: cons.append("Kilometresi yüksek, ağır bakım geçmişini sorgulayın.")
     
     market_comment = "Fiyat/performans dengeli görünüyor."
-    if price < avg_price * 0.8: market_comment = "Bu araç piyasaya göre FIRSAT niteliğinde olabilir, fiyatı uygun."
+    if deal_score is not None:
+        label = pricing.deal_label(deal_score)
+        diff = abs(price - expected) / expected * 100 if expected else 0
+        expected_str = f"{expected:,.0f}".replace(',', '.')
+        market_comment = f"Benzer marka/model, yıl ve kilometredeki araçlara göre beklenen fiyat: {expected_str} TL ({label}). "
+        if label == "FIRSAT": market_comment += f"İlan fiyatı beklenenden %{diff:.0f} düşük, fiyatı uygun."
+        elif label == "PAHALI": market_comment += f"İlan fiyatı beklenenden %{diff:.0f} yüksek, pazarlık payı olabilir."
+        else: market_comment += "Fiyat/performans dengeli görünüyor."
+    elif price < avg_price * 0.8: market_comment = "Bu araç piyasaya göre FIRSAT niteliğinde olabilir, fiyatı uygun."
     elif price > avg_price * 1.2: market_comment = "Premium segment veya yüksek donanımlı bir araç olduğu için fiyatı ortalamadan yüksek."
     
     personas = []
-    if 'Suv' in car.get('model') or 'Jeep' in car.get('brand') or 'Tucson' in car.get('title'): personas.append("Geniş aileler")
+    if 'Suv' in (car.get('model') or '') or 'Jeep' in (car.get('brand') or '') or 'Tucson' in (car.get('title') or ''): personas.append("Geniş aileler")
     if price < 1000000: personas.append("İlk aracını alacaklar")
-    if 'Sport' in car.get('title'): personas.append("Performans severler")
+    if 'Sport' in (car.get('title') or ''): personas.append("Performans severler")
     
     analysis_text = f"""
 ## 📊 {car.get('title')} Analiz Raporu
@@ -464,22 +483,210 @@ def analyze(car_id):
 **👥 Kimler İçin Uygun?**
 {', '.join(personas) if personas else 'Her tür kullanıcı grubu için değerlendirilebilir.'}
 """
-    return jsonify({'analysis': analysis_text.strip()})
+    return analysis_text.strip()
+
+def comparison_summary(cars):
+    """Short side-by-side comparison of the analysed cars"""
+    if len(cars) < 2:
+        return ""
+    cheapest = min(cars, key=lambda c: clean_price(c.get('price')))
+    lowest_km = min(cars, key=lambda c: clean_km(c.get('km')))
+    newest = max(cars, key=lambda c: clean_year(c.get('year')))
+    
+    lines = [f"## ⚖️ {len(cars)} Araç Karşılaştırması", ""]
+    for c in cars:
+        lines.append(f"- {c.get('title')}: {c.get('price')}, {c.get('year')}, {c.get('km')} km, {c.get('fuel')}, {c.get('transmission')}")
+    lines.append("")
+    lines.append(f"💰 En uygun fiyat: {cheapest.get('title')} ({cheapest.get('price')})")
+    lines.append(f"🛣️ En düşük kilometre: {lowest_km.get('title')} ({lowest_km.get('km')} km)")
+    lines.append(f"📅 En yeni model: {newest.get('title')} ({newest.get('year')})")
+    return "\n".join(lines)
+
+@app.route('/api/analyze/<car_id>')
+def analyze(car_id):
+    with span('analyze', 'load_cars'):
+        snapshot = catalog.snapshot()
+        car = snapshot.get(car_id)
+    if not car:
+        return jsonify({'analysis': "Araç bulunamadı."})
+        
+    # OpenAI Analysis
+    text = cached_analysis(snapshot.version, car_id)
+    if text is None and get_client():
+        with span('analyze', 'llm'):
+            text = llm_analysis(car)
+        if text is not None:
+            store_analysis(snapshot.version, car_id, text)
+    if text is not None:
+        return jsonify({'analysis': text})
+
+    # Heuristics for analysis (FALLBACK)
+    with span('analyze', 'heuristic'):
+        pricing.score_catalog(snapshot)
+        avg_price, avg_km = catalog_averages(snapshot)
+        analysis_text = heuristic_analysis(car, avg_price, avg_km)
+    return jsonify({'analysis': analysis_text})
+
+@app.route('/api/analyze/batch', methods=['POST'])
+def analyze_batch():
+    data = request.get_json(silent=True) or {}
+    ids = data.get('ids') or []
+    if not isinstance(ids, list) or not ids:
+        return jsonify({'error': "'ids' listesi gerekli."}), 400
+    
+    # Deduplicate while keeping request order
+    ids = list(dict.fromkeys(str(i) for i in ids))
+    if len(ids) > MAX_BATCH_IDS:
+        return jsonify({'error': f"En fazla {MAX_BATCH_IDS} araç birlikte analiz edilebilir."}), 400
+    
+    # Resolve all ids against one catalog version
+    with span('analyze_batch', 'load_cars'):
+        snapshot = catalog.snapshot()
+    found = {}
+    for car_id in ids:
+        car = snapshot.get(car_id)
+        if car:
+            found[car_id] = car
+    
+    stamp = snapshot.version
+    reports = {}
+    cached_ids = set()
+    pending = []
+    for car_id in ids:
+        if car_id not in found:
+            continue
+        text = cached_analysis(stamp, car_id)
+        if text is not None:
+            reports[car_id] = text
+            cached_ids.add(car_id)
+        else:
+            pending.append(car_id)
+    
+    # Each LLM call costs one token and one slot, decided here in the request
+    # context so refusals are reported in X-LLM-Degraded
+    client = get_client()
+    admitted = []
+    if client:
+        for car_id in pending:
+            if not admit_llm('analyze_batch'):
+                break
+            admitted.append(car_id)
+    
+    # Admitted cache misses go to the LLM as parallel, bounded calls
+    if admitted:
+        workers = min(ANALYZE_MAX_WORKERS, len(admitted))
+        with span('analyze_batch', 'llm'), ThreadPoolExecutor(max_workers=workers) as pool:
+            texts = pool.map(lambda cid: run_llm_analysis(client, found[cid], 'analyze_batch'), admitted)
+            for car_id, text in zip(admitted, texts):
+                if text is not None:
+                    reports[car_id] = text
+                    store_analysis(stamp, car_id, text)
+    
+    # Anything still missing gets the heuristic report
+    if any(cid not in reports for cid in pending):
+        pricing.score_catalog(snapshot)
+        avg_price, avg_km = catalog_averages(snapshot)
+        for car_id in pending:
+            if car_id not in reports:
+                reports[car_id] = heuristic_analysis(found[car_id], avg_price, avg_km)
+    
+    results = [
+        {'id': car_id, 'analysis': reports[car_id], 'cached': car_id in cached_ids}
+        for car_id in ids if car_id in found
+    ]
+    return jsonify({
+        'results': results,
+        'not_found': [car_id for car_id in ids if car_id not in found],
+        'comparison': comparison_summary([found[r['id']] for r in results])
+    })
 
 @app.route('/api/cars')
 def get_cars():
-    cars = load_cars()
-    return jsonify(cars)
+    snapshot = catalog.snapshot()
+    # Adds expected_price / deal_score to every listing (once per version)
+    pricing.score_catalog(snapshot)
+    return jsonify(snapshot.cars)
+
+@app.route('/api/facets')
+def api_facets():
+    """Result counts per filter value, e.g. /api/facets?city=Ankara&fuel=Dizel,LPG&year=2018-2020"""
+    with span('facets', 'load_cars'):
+        snapshot = catalog.snapshot()
+    
+    # Repeated (?fuel=Dizel&fuel=LPG) or comma separated values, OR'ed within a facet
+    filters = {}
+    for name in facets.FACETS:
+        values = [v.strip() for raw in request.args.getlist(name) for v in raw.split(',') if v.strip()]
+        if values:
+            filters[name] = values
+    
+    with span('facets', 'count'):
+        index = facets.get_index(snapshot)
+        matched, counts = index.counts(filters)
+    return jsonify({
+        'total': index.size,
+        'matched': matched,
+        'filters': filters,
+        'facets': counts
+    })
+
+@app.route('/api/metrics')
+def api_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
 
 @app.route("/api/health", methods=["GET"])
 def api_health():
+    # Never touches the catalog or the LLM so it answers right after launch
     return jsonify({
         "status": "ok",
         "service": "AracimSaglam Backend",
-        "mode": "api-ready"
+        "mode": "api-ready",
+        "catalog": "ready" if catalog.current() else "warming"
     })
 
 
+def prepare_snapshot(snapshot):
+    """Builds the derived caches of a new catalog version before it is served"""
+    catalog_averages(snapshot)
+    pricing.score_catalog(snapshot)
+    facets.get_index(snapshot)
+    with app.test_request_context('/'):
+        snapshot.memo(('index_html', 1), lambda: render_index_page(snapshot, 1))
+
+catalog.listeners.append(prepare_snapshot)
+
+def warm_up():
+    """Parses the catalog and its derived caches ahead of the first request"""
+    start = time.perf_counter()
+    snapshot = catalog.snapshot()
+    print(f"✓ Catalog ready:    {len(snapshot.cars)} cars in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+def warm_up_when_listening(host, port, timeout=30):
+    """Waits until the server accepts connections, then warms up in the background"""
+    def run():
+        probe_host = '127.0.0.1' if host in ('0.0.0.0', '') else host
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            try:
+                with socket.create_connection((probe_host, port), timeout=0.5):
+                    break
+            except OSError:
+                time.sleep(0.05)
+        print(f"✓ Listening after:  {(time.perf_counter() - STARTUP_T0) * 1000:.0f} ms")
+        warm_up()
+        # Pick up refreshed cars.json (refresh worker, manual edits) off the request path
+        watch_interval = float(os.environ.get('CATALOG_WATCH_INTERVAL', 5))
+        if watch_interval > 0:
+            catalog.start_watcher(watch_interval)
+        if host == '0.0.0.0':
+            # Hostname lookup can be slow, so it runs after the server is up
+            try:
+                local_ip = socket.gethostbyname(socket.gethostname())
+                print(f"✓ Network Access:   http://{local_ip}:{port}")
+            except:
+                pass
+    Thread(target=run, name='catalog-warmup', daemon=True).start()
+
 def open_browser(url):
     """Attempt to open the browser safely."""
     try:
@@ -501,16 +708,15 @@ if __name__ == '__main__':
     print(f"✓ Server running on: http://{host}:{port}")
     if host == '0.0.0.0':
         print(f"✓ Local Access:     {url}")
-        try:
-            hostname = socket.gethostname()
-            local_ip = socket.gethostbyname(hostname)
-            print(f"✓ Network Access:   http://{local_ip}:{port}")
-        except:
-            pass
     print("=" * 60)
 
+    # With the reloader on, only the serving child process needs the catalog
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        warm_up_when_listening(host, port)
+
     # Open browser only if not in debug mode (to avoid double tabs)
-    if not debug:
+    open_browser_enabled = os.environ.get('OPEN_BROWSER', 'true').lower() == 'true'
+    if not debug and open_browser_enabled:
         Timer(1.5, lambda: open_browser(url)).start()
     
     app.run(host=host, port=port, debug=debug)
@@ -24,6 +24,9 @@ if %errorlevel% neq 0 (
 
 echo.
 echo 1. Starting Flask App...
+:: Behind cloudflared every request comes from localhost; the visitor's IP
+:: is in CF-Connecting-IP (per-client rate limits)
+set TRUST_PROXY=true
 start "AracimSaglam Server" python run_app.py
 
 echo.
@@ -13,8 +13,9 @@ fi
 
 echo ""
 echo "1. Starting Flask App..."
-# Start in background
-python3 run_app.py > /dev/null 2>&1 &
+# Start in background. Behind cloudflared every request comes from localhost;
+# the visitor's IP is in CF-Connecting-IP (per-client rate limits).
+TRUST_PROXY=true python3 run_app.py > /dev/null 2>&1 &
 APP_PID=$!
 
 echo ""
@@ -0,0 +1,107 @@
+"""
+Search results page parser
+
+Reads the sahibinden.com results table straight from HTML (live
+page_source or a cached page) with the same selectors the Selenium
+scraper used element by element:
+
+    tr.searchResultsItem (fallback: tbody tr)  one listing, data-id
+    a.classifiedTitle                           title + href
+    td.searchResultsPriceValue                  price
+    td.searchResultsAttributeValue              year, km (in order)
+    td.searchResultsLocationValue               location
+    img                                         data-src or src
+
+Rows and cells are cut out with precompiled regular expressions instead
+of building a DOM; several times faster than html.parser and no WebDriver
+round trip per field (see benchmarks/bench_scraper.py).
+"""
+import re
+from datetime import datetime
+from html import unescape
+from urllib.parse import urljoin
+
+TBODY_RE = re.compile(r'<tbody\b[^>]*>(.*?)(?:</tbody>|$)', re.S | re.I)
+ROW_RE = re.compile(r'<tr\b([^>]*)>(.*?)(?=<tr\b|$)', re.S | re.I)
+LINK_RE = re.compile(r'<a\b([^>]*)>(.*?)</a>', re.S | re.I)
+CELL_RE = re.compile(r'<td\b([^>]*)>(.*?)</td>', re.S | re.I)
+IMG_RE = re.compile(r'<img\b([^>]*)>', re.I)
+CLASS_RE = re.compile(r'\bclass\s*=\s*["\']([^"\']*)', re.I)
+ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))')
+TAG_RE = re.compile(r'<[^>]+>')
+
+FIELD_CLASSES = {
+    'searchResultsPriceValue': 'price',
+    'searchResultsAttributeValue': 'attrs',
+    'searchResultsLocationValue': 'location',
+}
+
+
+def _attrs(text):
+    return {m.group(1).lower(): unescape(m.group(2) or m.group(3) or m.group(4) or '')
+            for m in ATTR_RE.finditer(text)}
+
+def _text(fragment):
+    """Visible text of an HTML fragment, whitespace collapsed (like element.text)"""
+    return ' '.join(unescape(TAG_RE.sub(' ', fragment)).split())
+
+def _parse_row(attr_text, body):
+    row_attrs = _attrs(attr_text)
+    row = {'item': 'searchResultsItem' in row_attrs.get('class', '').split(),
+           'id': row_attrs.get('data-id'), 'title': '', 'href': None,
+           'price': None, 'attrs': [], 'location': None, 'image': None}
+
+    for m in LINK_RE.finditer(body):
+        if 'classifiedTitle' in m.group(1):
+            a = _attrs(m.group(1))
+            if 'classifiedTitle' in a.get('class', '').split():
+                row['title'] = _text(m.group(2))
+                row['href'] = a.get('href') or ''
+                break
+
+    for m in CELL_RE.finditer(body):
+        cls_match = CLASS_RE.search(m.group(1))
+        if not cls_match:
+            continue
+        for cls in cls_match.group(1).split():
+            name = FIELD_CLASSES.get(cls)
+            if name == 'attrs':
+                row['attrs'].append(_text(m.group(2)))
+            elif name and row[name] is None:
+                row[name] = _text(m.group(2))
+
+    img = IMG_RE.search(body)
+    if img:
+        a = _attrs(img.group(1))
+        row['image'] = a.get('data-src') or a.get('src') or ''
+    return row
+
+
+def parse_search_results(html, base_url, max_items=None):
+    """Car dicts for the listings on a results page (same fields as the scraper output)"""
+    rows = []
+    for tbody in TBODY_RE.finditer(html):
+        rows.extend(_parse_row(m.group(1), m.group(2)) for m in ROW_RE.finditer(tbody.group(1)))
+
+    rows = [r for r in rows if r['item']] or rows
+    if max_items is not None:
+        rows = rows[:max_items]
+
+    cars = []
+    now = datetime.now().isoformat()
+    for idx, r in enumerate(rows):
+        if not r['title'] or not r['href']:
+            continue
+        attrs = r['attrs']
+        cars.append({
+            'id': r['id'] or str(idx),
+            'title': r['title'],
+            'url': urljoin(base_url, r['href']),
+            'price': r['price'] if r['price'] is not None else "Belirtilmemiş",
+            'year': attrs[0] if len(attrs) > 0 else "",
+            'km': attrs[1] if len(attrs) > 1 else "",
+            'location': r['location'] or "",
+            'date': now,
+            'image': r['image'] or ""
+        })
+    return cars
@@ -0,0 +1,123 @@
+"""
+Scraper page cache (record / replay)
+
+Fetched pages are stored content-addressed on disk:
+
+    cache/pages/blobs/ab/<sha256>.html   page bodies, identical pages stored once
+    cache/pages/index.jsonl              append-only log: url -> sha256 (last entry wins)
+
+Modes (SCRAPER_CACHE_MODE):
+    off     always fetch, store nothing (default)
+    record  always fetch and store the result
+    auto    serve stored pages, fetch and store only what is missing
+    replay  never touch the network; missing pages are reported as None
+
+Replay lets both scrapers (and benchmarks/bench_scraper.py) run offline
+against recorded or synthetic pages.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from threading import Lock
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(BASE_DIR, 'cache', 'pages')
+
+MODES = ('off', 'record', 'auto', 'replay')
+
+
+class PageCache:
+    def __init__(self, directory=None, mode='off'):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cache mode: {mode} (expected one of {', '.join(MODES)})")
+        self.directory = directory or DEFAULT_CACHE_DIR
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._index = {}  # url -> sha256
+        self._lock = Lock()
+        if mode != 'off':
+            os.makedirs(os.path.join(self.directory, 'blobs'), exist_ok=True)
+            self._load_index()
+
+    @property
+    def index_path(self):
+        return os.path.join(self.directory, 'index.jsonl')
+
+    def _blob_path(self, digest):
+        return os.path.join(self.directory, 'blobs', digest[:2], digest + '.html')
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self._index[entry['url']] = entry['sha256']
+                    except (ValueError, KeyError):
+                        continue  # torn last line after a crash
+        except FileNotFoundError:
+            pass
+
+    def get(self, url):
+        """Stored page body for url, or None"""
+        digest = self._index.get(url)
+        if digest is None:
+            return None
+        try:
+            with open(self._blob_path(digest), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, url, html):
+        """Stores html for url and returns its sha256"""
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            folder = os.path.dirname(path)
+            os.makedirs(folder, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.tmp-')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._index.get(url) != digest:
+                self._index[url] = digest
+                with open(self.index_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'url': url, 'sha256': digest,
+                                        'fetched': datetime.now().isoformat()}) + '\n')
+        return digest
+
+    def fetch(self, url, fetcher):
+        """Page body for url according to the mode; fetcher(url) -> html or None"""
+        if self.mode in ('auto', 'replay'):
+            html = self.get(url)
+            if html is not None:
+                self.hits += 1
+                return html
+            self.misses += 1
+            if self.mode == 'replay':
+                print(f"  ⚠️ Önbellekte yok (replay): {url}")
+                return None
+
+        html = fetcher(url)
+        if html is not None and self.mode in ('record', 'auto'):
+            self.put(url, html)
+        return html
+
+    def urls(self):
+        return list(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+
+def default_cache():
+    """Cache configured by SCRAPER_CACHE_MODE / SCRAPER_CACHE_DIR"""
+    return PageCache(os.environ.get('SCRAPER_CACHE_DIR') or DEFAULT_CACHE_DIR,
+                     os.environ.get('SCRAPER_CACHE_MODE', 'off').lower())
@@ -0,0 +1,220 @@
+"""
+Scheduled data refresh worker
+
+Runs the scrapers on an interval (with random jitter so several
+deployments don't hit sahibinden.com at the same moment), guarded by a
+job lock so only one refresh runs at a time, and writes the result to
+data/cars.json atomically. Running web processes notice the replaced
+file and swap catalogs in the background; no restart needed.
+
+Usage:
+    python scraper/refresh_worker.py                   # every 60 min ±10%
+    python scraper/refresh_worker.py --once --scraper api
+    python scraper/refresh_worker.py --interval 1800 --jitter 0.2 --max-items 200
+
+Each write is recorded next to the catalog (data/cars.refresh.json). A
+scrape with fewer than REFRESH_MIN_RATIO of the listings of the previous
+scrape is not written, so a partial run can't replace a good one. Before
+the first scrape the baseline is the current catalog (e.g. the 10k demo
+data); replacing it with a smaller scrape needs --allow-shrink once.
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import sys
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'agent'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from car_catalog import DEFAULT_CARS_PATH, write_snapshot
+
+DEFAULT_INTERVAL = int(os.environ.get('REFRESH_INTERVAL', 3600))
+DEFAULT_JITTER = float(os.environ.get('REFRESH_JITTER', 0.1))
+# A lock older than this is considered abandoned (crashed worker)
+LOCK_TTL = int(os.environ.get('REFRESH_LOCK_TTL', 2 * 3600))
+# New data must have at least this fraction of the current listings
+MIN_RATIO = float(os.environ.get('REFRESH_MIN_RATIO', 0.5))
+
+# cars.json fields the web app reads; missing ones are written as ''
+FIELDS = ('id', 'title', 'brand', 'model', 'year', 'price', 'engine', 'transmission',
+          'km', 'fuel', 'color', 'city', 'image')
+
+
+class JobLock:
+    """Cross-process lock file created with O_EXCL (works on Windows and POSIX)"""
+
+    def __init__(self, path, ttl=LOCK_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.acquired = False
+
+    def _is_stale(self):
+        try:
+            return time.time() - os.path.getmtime(self.path) > self.ttl
+        except OSError:
+            return False
+
+    def acquire(self):
+        for _ in range(2):
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if self._is_stale():
+                    print(f"⚠️ Eski kilit dosyası kaldırılıyor: {self.path}")
+                    try:
+                        os.remove(self.path)
+                    except OSError:
+                        pass
+                    continue
+                return False
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'pid': os.getpid(), 'host': socket.gethostname(),
+                           'started': datetime.now().isoformat()}, f)
+            self.acquired = True
+            return True
+        return False
+
+    def release(self):
+        if self.acquired:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.acquired = False
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def run_scraper(name, max_items):
+    """Imports the scraper lazily (selenium is heavy) and returns its listings"""
+    if name == 'selenium':
+        from sahibinden_scraper import SahibindenScraper
+        scraper = SahibindenScraper()
+    else:
+        from sahibinden_api_scraper import SahibindenAPIScraper
+        scraper = SahibindenAPIScraper()
+    try:
+        return scraper.scrape_cars(max_items=max_items)
+    except SystemExit:
+        # SahibindenScraper exits when Chrome can't start
+        return []
+
+def normalize(cars):
+    """Maps scraper output to the cars.json schema (see data/cars.json)"""
+    result = []
+    for car in cars:
+        record = {field: car.get(field) or '' for field in FIELDS}
+        # Extra scraper fields (url, location, date) are kept
+        for key, value in car.items():
+            record.setdefault(key, value)
+        if not record['city'] and car.get('location'):
+            record['city'] = car['location']
+        # "50.000 km" -> "50.000", like the rest of the catalog
+        record['km'] = str(record['km']).replace('km', '').replace('KM', '').strip()
+        record['year'] = str(record['year'])
+        result.append(record)
+    return result
+
+def record_path(cars_path):
+    return os.path.splitext(cars_path)[0] + '.refresh.json'
+
+def baseline_size(cars_path):
+    """Listings of the previous scrape, or of the current catalog if it wasn't scraped (0 if none)"""
+    for path in (record_path(cars_path), cars_path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        return data.get('count', 0) if isinstance(data, dict) else len(data)
+    return 0
+
+def write_record(cars_path, name, count):
+    with open(record_path(cars_path), 'w', encoding='utf-8') as f:
+        json.dump({'scraper': name, 'count': count, 'written': datetime.now().isoformat()}, f)
+
+def refresh_once(scrapers, max_items, cars_path, allow_shrink=False):
+    """One refresh job. Returns the number of listings written (0 = kept old data)."""
+    with JobLock(cars_path + '.lock') as acquired:
+        if not acquired:
+            print("⏭️ Başka bir yenileme işi çalışıyor, atlanıyor.")
+            return 0
+        for name in scrapers:
+            started = time.time()
+            print(f"🔄 [{datetime.now():%H:%M:%S}] {name} scraper çalışıyor...")
+            try:
+                cars = normalize(run_scraper(name, max_items))
+            except Exception as e:
+                print(f"✗ {name} scraper hatası: {e}")
+                continue
+            if cars:
+                baseline = baseline_size(cars_path)
+                if not allow_shrink and len(cars) < baseline * MIN_RATIO:
+                    print(f"⚠️ {name} scraper {len(cars)} ilan getirdi, önceki veride {baseline} var; "
+                          f"katalog korunuyor (--allow-shrink ile yazılabilir).")
+                    continue
+                write_snapshot(cars, cars_path)
+                write_record(cars_path, name, len(cars))
+                print(f"✅ {len(cars)} ilan yazıldı ({time.time() - started:.1f}s): {cars_path}")
+                return len(cars)
+            print(f"⚠️ {name} scraper veri döndürmedi.")
+        # Never replace a good catalog with an empty or truncated one
+        print("⚠️ Yazılacak veri yok, mevcut katalog korunuyor.")
+        return 0
+
+def next_delay(interval, jitter, rng=random):
+    return max(1.0, interval * (1 + rng.uniform(-jitter, jitter)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Periodically refresh data/cars.json')
+    parser.add_argument('--interval', type=int, default=DEFAULT_INTERVAL, help='Seconds between runs')
+    parser.add_argument('--jitter', type=float, default=DEFAULT_JITTER,
+                        help='Random +/- fraction applied to the interval')
+    parser.add_argument('--scraper', default='selenium,api',
+                        help='Scrapers to try in order (selenium, api)')
+    parser.add_argument('--max-items', type=int, default=20)
+    parser.add_argument('--out', default=os.environ.get('CARS_PATH') or DEFAULT_CARS_PATH)
+    parser.add_argument('--once', action='store_true', help='Run a single refresh and exit')
+    parser.add_argument('--allow-shrink', action='store_true',
+                        help='Write the result even if it is much smaller than the current catalog')
+    args = parser.parse_args()
+
+    scrapers = [s.strip() for s in args.scraper.split(',') if s.strip()]
+
+    baseline = baseline_size(args.out)
+    if not args.allow_shrink and args.max_items < baseline * MIN_RATIO:
+        print(f"⚠️ --max-items {args.max_items}, mevcut {baseline} ilanın %{MIN_RATIO * 100:.0f}'inden az: "
+              f"tarama sonuçları yazılmayacak. İlk kez değiştirmek için --allow-shrink kullanın.")
+
+    if args.once:
+        refresh_once(scrapers, args.max_items, args.out, args.allow_shrink)
+        return
+
+    print(f"⏰ Yenileme işçisi başladı: her {args.interval}s (±%{args.jitter * 100:.0f}), scraper: {scrapers}")
+    # Small random delay before the first run, so restarts don't line up
+    time.sleep(args.interval * args.jitter * random.random())
+    while True:
+        try:
+            refresh_once(scrapers, args.max_items, args.out, args.allow_shrink)
+        except Exception as e:
+            print(f"✗ Yenileme hatası: {e}")
+        delay = next_delay(args.interval, args.jitter)
+        print(f"💤 Sonraki çalışma {delay / 60:.1f} dk sonra")
+        time.sleep(delay)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
@@ -1,15 +1,57 @@
-import json
+import os
+import re
+import sys
 import requests
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'agent'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from car_catalog import write_snapshot
+from page_cache import default_cache
+
+ID_PATTERN = re.compile(r'data-id="(\d+)"')
+TITLE_PATTERN = re.compile(r'title="([^"]+)"')
+PRICE_PATTERN = re.compile(r'(\d+(?:\.\d+)*)\s*TL')
+
 class SahibindenAPIScraper:
-    def __init__(self):
+    def __init__(self, cache=None):
         self.base_url = "https://www.sahibinden.com"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Accept': 'application/json',
             'X-Requested-With': 'XMLHttpRequest'
         }
+        # Record/replay of fetched pages (SCRAPER_CACHE_MODE, see page_cache.py)
+        self.cache = cache or default_cache()
+    
+    def _download(self, url):
+        """Page HTML, or None unless the server answers 200"""
+        response = requests.get(url, headers=self.headers, timeout=10)
+        if response.status_code == 200:
+            return response.text
+        return None
+    
+    def parse_page(self, html, offset=0, limit=5):
+        """Listings found in one search page; offset numbers the fallback ids/titles"""
+        ids = ID_PATTERN.findall(html)
+        titles = TITLE_PATTERN.findall(html)
+        prices = PRICE_PATTERN.findall(html)
+        
+        cars = []
+        for i in range(min(len(ids), limit)):
+            n = offset + len(cars)
+            cars.append({
+                'id': ids[i] if i < len(ids) else str(n),
+                'title': titles[i] if i < len(titles) else f"Araba {n+1}",
+                'url': f"{self.base_url}/ilan/{ids[i]}" if i < len(ids) else "",
+                'price': f"{prices[i]} TL" if i < len(prices) else "Belirtilmemiş",
+                'year': "2020",
+                'km': "50.000 km",
+                'location': "İstanbul",
+                'date': datetime.now().isoformat(),
+                'image': f"https://placehold.co/300x200?text=Araba+{n+1}"
+            })
+        return cars
     
     def scrape_cars(self, max_items=20):
         """Sahibinden API'sinden veri çeker"""
@@ -34,35 +76,13 @@ class SahibindenAPIScraper:
                 url = f"{self.base_url}{search_url}"
                 print(f"Çekiliyor: {url}")
                 
-                response = requests.get(url, headers=self.headers, timeout=10)
+                html = self.cache.fetch(url, self._download)
                 
-                if response.status_code == 200:
-                    # HTML'den JSON data çıkar
-                    html = response.text
-                    
-                    # classifiedId pattern'i ara
-                    import re
-                    ids = re.findall(r'data-id="(\d+)"', html)
-                    titles = re.findall(r'title="([^"]+)"', html)
-                    prices = re.findall(r'(\d+(?:\.\d+)*)\s*TL', html)
-                    
-                    print(f"  {len(ids)} ilan bulundu")
+                if html is not None:
+                    print(f"  {len(ID_PATTERN.findall(html))} ilan bulundu")
                     
-                    for i in range(min(len(ids), 5)):  # Her kategoriden 5 ilan
-                        if len(cars) >= max_items:
-                            break
-                            
-                        car = {
-                            'id': ids[i] if i < len(ids) else str(len(cars)),
-                            'title': titles[i] if i < len(titles) else f"Araba {len(cars)+1}",
-                            'url': f"{self.base_url}/ilan/{ids[i]}" if i < len(ids) else "",
-                            'price': f"{prices[i]} TL" if i < len(prices) else "Belirtilmemiş",
-                            'year': "2020",
-                            'km': "50.000 km",
-                            'location': "İstanbul",
-                            'date': datetime.now().isoformat(),
-                            'image': f"https://placehold.co/300x200?text=Araba+{len(cars)+1}"
-                        }
+                    # Her kategoriden 5 ilan
+                    for car in self.parse_page(html, len(cars), min(5, max_items - len(cars))):
                         cars.append(car)
                         print(f"  ✓ {car['title'][:50]}")
                 
@@ -72,10 +92,10 @@ class SahibindenAPIScraper:
         
         return cars
     
-    def save_to_json(self, cars, filename='../data/cars.json'):
+    def save_to_json(self, cars, filename=None):
         """Verileri JSON dosyasına kaydeder"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(cars, f, ensure_ascii=False, indent=2)
+        # Atomic replace; defaults to data/cars.json regardless of the working directory
+        filename = write_snapshot(cars, filename)
         print(f"\n✅ {len(cars)} araba kaydedildi: {filename}")
 
 if __name__ == "__main__":
@@ -1,25 +1,32 @@
-import json
 import time
 import os
 import sys
-from datetime import datetime
 from dotenv import load_dotenv
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'agent'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from car_catalog import write_snapshot
+from listing_parser import parse_search_results
+from page_cache import default_cache
 
 # Load environment variables
 load_dotenv()
 
 class SahibindenScraper:
-    def __init__(self):
+    def __init__(self, cache=None):
         self.base_url = "https://www.sahibinden.com/otomobil"
         self.driver = None
+        # Record/replay of fetched pages (SCRAPER_CACHE_MODE, see page_cache.py)
+        self.cache = cache or default_cache()
         
     def setup_driver(self):
         """Chrome driver'ı ayarla"""
+        # Imported here so replaying cached pages works without selenium
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from selenium.webdriver.chrome.options import Options
+        from webdriver_manager.chrome import ChromeDriverManager
+        
         chrome_options = Options()
         
         # Check environment variable for headless mode (default to true)
@@ -45,42 +52,29 @@ class SahibindenScraper:
             print("2. İnternet bağlantınızı kontrol edin (Driver indirmek için).")
             sys.exit(1)
         
+    def _load_page(self, url):
+        """Opens url in Chrome and returns the rendered HTML"""
+        if self.driver is None:
+            self.setup_driver()
+        self.driver.get(url)
+        
+        # Sayfanın yüklenmesini bekle
+        time.sleep(3)
+        return self.driver.page_source
+    
     def scrape_cars(self, max_items=20):
         """Sahibinden.com'dan araba ilanlarını çeker"""
         print(f"Selenium ile veri çekiliyor: {self.base_url}")
         
         try:
-            self.setup_driver()
-            self.driver.get(self.base_url)
-            
-            # Sayfanın yüklenmesini bekle
-            time.sleep(3)
-            
-            cars = []
-            
-            # İlanları bul
-            try:
-                # Farklı selector'ları dene
-                listings = self.driver.find_elements(By.CSS_SELECTOR, "tr.searchResultsItem")
-                
-                if not listings:
-                    listings = self.driver.find_elements(By.CSS_SELECTOR, "tbody tr")
-                
-                print(f"{len(listings)} ilan bulundu")
-                
-                for idx, listing in enumerate(listings[:max_items]):
-                    try:
-                        car = self._parse_listing(listing, idx)
-                        if car:
-                            cars.append(car)
-                            print(f"✓ {idx+1}. {car['title'][:50]}...")
-                    except Exception as e:
-                        print(f"✗ İlan {idx+1} parse hatası: {e}")
-                        continue
-                        
-            except Exception as e:
-                print(f"İlan bulunamadı: {e}")
-            
+            # Chrome only starts if the page isn't served from the cache
+            html = self.cache.fetch(self.base_url, self._load_page)
+            if html is None:
+                return []
+            cars = self.parse_page(html, max_items)
+            print(f"{len(cars)} ilan bulundu")
+            for idx, car in enumerate(cars):
+                print(f"✓ {idx+1}. {car['title'][:50]}...")
             return cars
             
         except Exception as e:
@@ -90,66 +84,12 @@ class SahibindenScraper:
         finally:
             if self.driver:
                 self.driver.quit()
+                self.driver = None
     
-    def _parse_listing(self, listing, idx):
-        """Tek bir ilanı parse eder"""
-        try:
-            # Başlık
-            title_elem = listing.find_element(By.CSS_SELECTOR, "a.classifiedTitle")
-            title = title_elem.text.strip()
-            url = title_elem.get_attribute('href')
-            
-            if not title or not url:
-                return None
-            
-            # Fiyat
-            try:
-                price_elem = listing.find_element(By.CSS_SELECTOR, "td.searchResultsPriceValue")
-                price = price_elem.text.strip()
-            except:
-                price = "Belirtilmemiş"
-            
-            # Özellikler (yıl, km)
-            try:
-                attrs = listing.find_elements(By.CSS_SELECTOR, "td.searchResultsAttributeValue")
-                year = attrs[0].text.strip() if len(attrs) > 0 else ""
-                km = attrs[1].text.strip() if len(attrs) > 1 else ""
-            except:
-                year = ""
-                km = ""
-            
-            # Konum
-            try:
-                loc_elem = listing.find_element(By.CSS_SELECTOR, "td.searchResultsLocationValue")
-                location = loc_elem.text.strip()
-            except:
-                location = ""
-            
-            # Resim
-            try:
-                img_elem = listing.find_element(By.CSS_SELECTOR, "img")
-                image = img_elem.get_attribute('data-src') or img_elem.get_attribute('src')
-            except:
-                image = ""
-            
-            # ID
-            car_id = listing.get_attribute('data-id') or str(idx)
-            
-            return {
-                'id': car_id,
-                'title': title,
-                'url': url,
-                'price': price,
-                'year': year,
-                'km': km,
-                'location': location,
-                'date': datetime.now().isoformat(),
-                'image': image
-            }
-            
-        except Exception as e:
-            # print(f"Parse hatası: {e}") # Sessiz mod
-            return None
+    def parse_page(self, html, max_items=20):
+        """Listings of one results page (live page_source or a cached page)"""
+        # One parse of the HTML instead of a WebDriver round trip per field
+        return parse_search_results(html, self.base_url, max_items)
     
     def save_to_json(self, cars, filename=None):
         """Verileri JSON dosyasına kaydeder"""
@@ -158,11 +98,8 @@ class SahibindenScraper:
             base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
             filename = os.path.join(base_dir, 'data', 'cars.json')
 
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
-            
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(cars, f, ensure_ascii=False, indent=2)
+        # Atomic replace: running web apps never read a half-written file
+        write_snapshot(cars, filename)
         print(f"\n✅ {len(cars)} araba kaydedildi: {filename}")
 
 if __name__ == "__main__":
@@ -4,6 +4,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
+from page_cache import PageCache
 
 # Chrome setup
 chrome_options = Options()
@@ -24,6 +25,10 @@ try:
         f.write(driver.page_source)
     print("✓ Sayfa kaydedildi: page_source.html")
     
+    # Aynı sayfayı önbelleğe de yaz: SCRAPER_CACHE_MODE=replay ile scraper'lar çevrimdışı çalışır
+    PageCache(mode='record').put("https://www.sahibinden.com/otomobil", driver.page_source)
+    print("✓ Sayfa önbelleğe kaydedildi: cache/pages")
+    
     # Farklı selector'ları dene
     selectors = [
         "tr.searchResultsItem",
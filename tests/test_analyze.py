@@ -0,0 +1,47 @@
+"""
+/api/analyze and /api/analyze/batch on scraper-shaped listings.
+
+    python -m pytest tests
+"""
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('RATE_LIMIT_PER_MIN', '0')
+import run_app
+from car_catalog import CarCatalog
+
+CARS = [
+    {'id': '1', 'title': '2020 Toyota Corolla', 'brand': 'Toyota', 'model': 'Corolla', 'year': '2020',
+     'price': '900.000 TL', 'km': '40.000', 'fuel': 'Benzin', 'transmission': 'Otomatik', 'city': 'Ankara'},
+    # As the scrapers write it when the attribute cells are missing
+    {'id': '2', 'title': 'Fiat Egea', 'brand': '', 'model': '', 'year': '', 'price': '600.000 TL',
+     'km': '', 'fuel': '', 'transmission': '', 'city': 'İstanbul'},
+]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = tmp_path / 'cars.json'
+    path.write_text(json.dumps(CARS), encoding='utf-8')
+    monkeypatch.setattr(run_app, 'catalog', CarCatalog(str(path)))
+    monkeypatch.setattr(run_app, 'get_client', lambda: None)
+    return run_app.app.test_client()
+
+
+def test_batch_with_missing_year(client):
+    response = client.post('/api/analyze/batch', json={'ids': ['1', '2']})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [r['id'] for r in data['results']] == ['1', '2']
+    assert 'En yeni model: 2020 Toyota Corolla' in data['comparison']
+
+def test_analyze_missing_fields(client):
+    response = client.get('/api/analyze/2')
+    assert response.status_code == 200
+    assert 'Fiat Egea' in response.get_json()['analysis']
@@ -0,0 +1,96 @@
+"""
+Follow-up behaviour of the assistant sessions (merge / narrow / refine).
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'agent'))
+
+from car_catalog import CatalogSnapshot, turkish_lower
+from assistant import find_matches, local_reply, merge_criteria, narrows, refine, session_state
+from sessions import SessionStore
+
+
+def car(id, brand, city, fuel, year, price, km, transmission='Manuel'):
+    return {'id': id, 'title': f'{year} {brand}', 'brand': brand, 'model': '', 'city': city,
+            'fuel': fuel, 'transmission': transmission, 'year': str(year),
+            'price': f'{price} TL', 'km': str(km)}
+
+CARS = [
+    car('1', 'Renault', 'Ankara', 'Dizel', 2016, 500000, 150000),
+    car('2', 'Renault', 'Ankara', 'Dizel', 2019, 700000, 90000),
+    car('3', 'Fiat', 'Ankara', 'Dizel', 2021, 900000, 40000, 'Otomatik'),
+    car('4', 'Fiat', 'İstanbul', 'Benzin', 2022, 800000, 20000),
+    car('5', 'Renault', 'Ankara', 'Benzin', 2018, 600000, 80000),
+]
+
+def snapshot():
+    return CatalogSnapshot(CARS, 1, (1, 1))
+
+def ask(snap, msg, previous=None):
+    msg = turkish_lower(msg)
+    criteria, filtered, matches = find_matches(snap, msg, previous=previous)
+    return criteria, filtered, matches, session_state(snap, msg, criteria, filtered, previous)
+
+def ids(matches):
+    return [m['id'] for m in matches]
+
+
+def test_merge_keeps_unspecified_criteria():
+    previous = {'brands': ['renault'], 'cities': ['ankara'], 'budget_max': 800000, 'sort': 'price_asc'}
+    current = {'brands': [], 'cities': ['istanbul'], 'budget_max': None, 'sort': 'default'}
+    merged = merge_criteria(previous, current)
+    assert merged == {'brands': ['renault'], 'cities': ['istanbul'], 'budget_max': 800000, 'sort': 'price_asc'}
+
+def test_narrows():
+    base = {'brands': [], 'cities': ['ankara'], 'fuels': [], 'transmissions': [],
+            'budget_min': None, 'year_min': None, 'budget_max': 800000, 'year_max': None, 'km_max': None}
+    assert narrows(base, dict(base, fuels=['dizel'], budget_max=600000))
+    assert not narrows(base, dict(base, cities=['istanbul']))
+    assert not narrows(base, dict(base, budget_max=900000))
+
+def test_refine_relative_to_top_car():
+    snap = snapshot()
+    criteria = {'budget_max': None, 'year_min': None, 'km_max': None, 'sort': 'default'}
+    refined, applied = refine(criteria, 'daha yeni olsun', snap.rows[1])
+    assert applied == ['newer'] and refined['year_min'] == 2020
+    assert criteria['year_min'] is None  # input untouched
+
+def test_follow_up_narrows_previous_result():
+    snap = snapshot()
+    _, filtered, matches, state = ask(snap, 'ankarada dizel araba')
+    assert ids(matches) == ['1', '2', '3']
+    criteria, _, matches, _ = ask(snap, 'daha yeni olsun', state)
+    assert criteria['year_min'] == 2017
+    assert ids(matches) == ['2', '3']
+
+def test_cheaper_when_already_cheapest():
+    snap = snapshot()
+    _, _, _, state = ask(snap, 'ankarada dizel araba')
+    criteria, filtered, matches, state = ask(snap, 'daha ucuzu var mı?', state)
+    assert criteria['unmet'] == ['cheaper']
+    assert ids(matches) == ['1', '2', '3']
+    assert "Daha ucuzu yok" in local_reply(criteria, filtered, matches)
+
+    # The note isn't carried into the next message
+    criteria, _, matches, _ = ask(snap, 'otomatik olsun', state)
+    assert 'unmet' not in criteria
+    assert ids(matches) == ['3']
+
+def test_cheaper_under_km_ordering():
+    snap = snapshot()
+    _, _, matches, state = ask(snap, 'ankarada en az km araba')
+    assert matches[0]['id'] == '3'
+    criteria, _, matches, _ = ask(snap, 'daha ucuzu var mı', state)
+    assert 'unmet' not in criteria
+    assert ids(matches) == ['1', '5', '2']
+
+def test_sqlite_sessions_shared_between_stores(tmp_path):
+    db = str(tmp_path / 'sessions.db')
+    a, b = SessionStore(db_path=db), SessionStore(db_path=db)
+    a.put('session-1234', {'v': 1})
+    assert b.get('session-1234') == {'v': 1}
+    b.put('session-1234', {'v': 2})
+    assert a.get('session-1234') == {'v': 2}
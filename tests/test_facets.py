@@ -0,0 +1,55 @@
+"""
+Facet counts: disjunctive semantics and bucket edges.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'agent'))
+
+from car_catalog import CatalogSnapshot
+from facets import FacetIndex
+
+
+def car(id, brand, city, year, price, fuel='Dizel'):
+    return {'id': id, 'brand': brand, 'city': city, 'fuel': fuel, 'transmission': 'Manuel',
+            'year': str(year), 'price': f'{price} TL', 'km': '10.000'}
+
+CARS = [
+    car('1', 'Renault', 'Ankara', 2014, 499999),
+    car('2', 'Renault', 'Ankara', 2015, 500000),
+    car('3', 'Fiat', 'Ankara', 2017, 999999, 'Benzin'),
+    car('4', 'Fiat', 'İstanbul', 2018, 1000000),
+    car('5', 'Toyota', 'İstanbul', 2023, 5000000),
+]
+
+def counts(filters):
+    matched, facets = FacetIndex(CatalogSnapshot(CARS, 1, (1, 1))).counts(filters)
+    return matched, {name: {item['value']: item['count'] for item in items} for name, items in facets.items()}
+
+
+def test_bucket_edges():
+    _, facets = counts({})
+    assert facets['year'] == {'-2014': 1, '2015-2017': 2, '2018-2020': 1, '2023-': 1}
+    # Price buckets include their lower bound only
+    assert facets['price'] == {'-500000': 1, '500000-1000000': 2, '1000000-1500000': 1, '5000000-': 1}
+
+def test_counts_ignore_the_facets_own_selection():
+    matched, facets = counts({'city': ['Ankara']})
+    assert matched == 3
+    # Other cities still show what selecting them would add
+    assert facets['city'] == {'Ankara': 3, 'İstanbul': 2}
+    # Other facets are restricted to Ankara
+    assert facets['brand'] == {'Renault': 2, 'Fiat': 1}
+
+def test_values_of_a_facet_are_ored_facets_anded():
+    matched, facets = counts({'brand': ['Renault', 'Fiat'], 'fuel': ['Dizel']})
+    assert matched == 3
+    assert facets['fuel'] == {'Dizel': 3, 'Benzin': 1}
+    assert facets['brand'] == {'Renault': 2, 'Fiat': 1, 'Toyota': 1}
+
+def test_selected_value_without_matches_is_listed():
+    matched, facets = counts({'city': ['İstanbul'], 'year': ['-2014']})
+    assert matched == 0
+    assert facets['year']['-2014'] == 0
@@ -0,0 +1,64 @@
+"""
+Thumbnail cache: failures, non-image payloads, workers sharing a directory.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'agent'))
+
+from image_cache import ThumbnailCache, ImageUnavailable
+
+GIF = b'GIF89a' + b'\x00' * 64
+
+
+class Fetcher:
+    def __init__(self, body=GIF, error=None):
+        self.body, self.error, self.calls = body, error, 0
+
+    def __call__(self, url):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.body
+
+
+def test_failed_fetch_is_not_retried_within_ttl(tmp_path):
+    fetcher = Fetcher(error=TimeoutError('slow cdn'))
+    cache = ThumbnailCache(str(tmp_path), fetcher=fetcher)
+    with pytest.raises(TimeoutError):
+        cache.get('http://dead/1.jpg')
+    with pytest.raises(ImageUnavailable):
+        cache.get('http://dead/1.jpg')
+    assert fetcher.calls == 1
+
+def test_failure_expires(tmp_path):
+    fetcher = Fetcher(error=TimeoutError('slow cdn'))
+    cache = ThumbnailCache(str(tmp_path), fetcher=fetcher, failure_ttl=0)
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            cache.get('http://dead/1.jpg')
+    assert fetcher.calls == 2
+
+def test_non_image_is_rejected(tmp_path):
+    cache = ThumbnailCache(str(tmp_path), fetcher=Fetcher(body=b'<html>not an image</html>'))
+    with pytest.raises(ImageUnavailable):
+        cache.get('http://example.com/page')
+    assert cache.total_bytes == 0
+
+def test_workers_share_the_directory(tmp_path):
+    fetcher = Fetcher()
+    a = ThumbnailCache(str(tmp_path), fetcher=fetcher)
+    b = ThumbnailCache(str(tmp_path), fetcher=fetcher)
+    path, _, hit = a.get('http://img/1.gif')
+    assert not hit
+    # Stored by the other worker: adopted, not fetched again
+    assert b.get('http://img/1.gif')[2] is True
+    assert fetcher.calls == 1
+    # Evicted by the other worker: a miss, fetched again
+    os.remove(path)
+    assert b.get('http://img/1.gif')[2] is False
+    assert fetcher.calls == 2
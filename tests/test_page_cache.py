@@ -0,0 +1,67 @@
+"""
+Scraper page cache modes (off / record / auto / replay).
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scraper'))
+
+from page_cache import PageCache
+
+URL = 'https://www.sahibinden.com/otomobil/fiat'
+
+
+class Fetcher:
+    def __init__(self, html='<html>page</html>'):
+        self.html, self.calls = html, 0
+
+    def __call__(self, url):
+        self.calls += 1
+        return self.html
+
+
+def test_off_never_stores(tmp_path):
+    cache = PageCache(str(tmp_path), 'off')
+    fetcher = Fetcher()
+    cache.fetch(URL, fetcher)
+    cache.fetch(URL, fetcher)
+    assert fetcher.calls == 2
+    assert len(cache) == 0
+
+def test_record_always_fetches_and_stores(tmp_path):
+    cache = PageCache(str(tmp_path), 'record')
+    fetcher = Fetcher()
+    cache.fetch(URL, fetcher)
+    cache.fetch(URL, fetcher)
+    assert fetcher.calls == 2
+    assert cache.get(URL) == fetcher.html
+
+def test_auto_fetches_only_missing_pages(tmp_path):
+    cache = PageCache(str(tmp_path), 'auto')
+    fetcher = Fetcher()
+    assert cache.fetch(URL, fetcher) == fetcher.html
+    assert cache.fetch(URL, fetcher) == fetcher.html
+    assert fetcher.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_replay_is_offline_and_survives_restart(tmp_path):
+    PageCache(str(tmp_path), 'record').fetch(URL, Fetcher())
+    cache = PageCache(str(tmp_path), 'replay')
+    fetcher = Fetcher()
+    assert cache.fetch(URL, fetcher) == '<html>page</html>'
+    assert cache.fetch(URL + '?page=2', fetcher) is None
+    assert fetcher.calls == 0
+
+def test_identical_pages_stored_once(tmp_path):
+    cache = PageCache(str(tmp_path), 'record')
+    assert cache.put(URL, 'same') == cache.put(URL + '/2', 'same')
+    blobs = [f for _, _, files in os.walk(tmp_path / 'blobs') for f in files]
+    assert len(blobs) == 1
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        PageCache(mode='sometimes')
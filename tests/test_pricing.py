@@ -0,0 +1,54 @@
+"""
+Price model: deal scores, listings with blank year / km.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'agent'))
+
+pytest.importorskip('numpy')
+
+from car_catalog import CatalogSnapshot
+import pricing
+
+
+def car(id, year, price, km, model='Corolla'):
+    return {'id': id, 'title': f'{year} Toyota {model}', 'brand': 'Toyota', 'model': model,
+            'year': str(year), 'price': f'{price} TL', 'km': str(km)}
+
+def catalog(extra=()):
+    cars = [car(str(i), 2015 + i % 8, 600000 + (i % 8) * 80000 - (i % 5) * 10000, 150000 - (i % 8) * 15000)
+            for i in range(40)]
+    return CatalogSnapshot(cars + list(extra), 1, (1, 1))
+
+
+def test_cheap_listing_is_a_deal():
+    snapshot = catalog([car('cheap', 2020, 400000, 60000), car('dear', 2020, 1400000, 60000)])
+    scores = pricing.score_catalog(snapshot)
+    cheap, dear = snapshot.cars[-2], snapshot.cars[-1]
+    assert pricing.deal_label(cheap['deal_score']) == "FIRSAT"
+    assert pricing.deal_label(dear['deal_score']) == "PAHALI"
+    assert scores.get(len(snapshot.cars) - 2)[1] == pytest.approx(cheap['deal_score'], abs=1e-3)
+
+def test_blank_year_or_km_is_not_scored():
+    blank_year = dict(car('y', 2020, 800000, 60000), year='')
+    blank_km = dict(car('k', 2020, 800000, 60000), km='')
+    snapshot = catalog([blank_year, blank_km])
+    scores = pricing.score_catalog(snapshot)
+    for c in snapshot.cars[-2:]:
+        assert c['expected_price'] is None
+        assert c['deal_score'] is None
+        assert pricing.deal_label(c['deal_score']) is None
+    assert scores.get(len(snapshot.cars) - 1) == (None, None)
+    # Ranked as fairly priced
+    assert scores.sort_score[-1] == 0.0
+
+def test_missing_price_has_expected_but_no_score():
+    snapshot = catalog([dict(car('p', 2020, 0, 60000), price='')])
+    pricing.score_catalog(snapshot)
+    assert snapshot.cars[-1]['expected_price'] > 0
+    assert snapshot.cars[-1]['deal_score'] is None
@@ -0,0 +1,59 @@
+"""
+Token buckets, admission gate and client address parsing.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'agent'))
+
+import rate_limit
+from rate_limit import MemoryLimiter, AdmissionGate, forwarded_client, make_limiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_burst_then_refill(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, 'monotonic', clock)
+    limiter = MemoryLimiter(rate=1.0, burst=3)
+    assert [limiter.allow('a') for _ in range(4)] == [True, True, True, False]
+    # Other keys have their own bucket
+    assert limiter.allow('b')
+    clock.now += 1.5
+    assert limiter.allow('a')
+    assert not limiter.allow('a')
+
+def test_cost_takes_several_tokens(monkeypatch):
+    monkeypatch.setattr(rate_limit.time, 'monotonic', Clock())
+    limiter = MemoryLimiter(rate=1.0, burst=5)
+    assert limiter.allow('a', cost=4)
+    assert not limiter.allow('a', cost=2)
+    assert limiter.allow('a', cost=1)
+
+def test_make_limiter_disabled():
+    assert make_limiter(0, 5) is None
+    assert isinstance(make_limiter(60, 5), MemoryLimiter)
+
+def test_admission_gate():
+    gate = AdmissionGate(2)
+    assert gate.try_acquire() and gate.try_acquire()
+    assert not gate.try_acquire()
+    gate.release()
+    assert gate.try_acquire()
+    assert gate.in_flight == 2
+
+def test_forwarded_client():
+    assert forwarded_client('203.0.113.7', 'CF-Connecting-IP') == '203.0.113.7'
+    # Only the entry our proxy appended counts, not what the client sent
+    assert forwarded_client('6.6.6.6, 203.0.113.7', 'X-Forwarded-For') == '203.0.113.7'
+    assert forwarded_client('6.6.6.6, 203.0.113.7, 10.0.0.2', 'x-forwarded-for', hops=2) == '203.0.113.7'
+    assert forwarded_client('203.0.113.7', 'X-Forwarded-For', hops=2) is None
+    assert forwarded_client(None, 'CF-Connecting-IP') is None
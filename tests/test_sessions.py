@@ -0,0 +1,36 @@
+"""
+Assistant sessions: server-issued ids, SQLite connections across fork.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('RATE_LIMIT_PER_MIN', '0')
+import run_app
+import sessions
+from sessions import SessionStore
+
+
+def test_unknown_id_is_replaced(monkeypatch):
+    monkeypatch.setattr(run_app, 'session_store', SessionStore())
+    session_id, previous = run_app.get_session('chosen-by-client')
+    assert session_id != 'chosen-by-client' and previous is None
+
+    run_app.session_store.put(session_id, {'v': 1})
+    assert run_app.get_session(session_id) == (session_id, {'v': 1})
+
+def test_connection_opened_per_process(tmp_path, monkeypatch):
+    store = SessionStore(db_path=str(tmp_path / 'sessions.db'))
+    # Nothing opened until first use, so a preloaded app has no handle to fork
+    assert store._db is None
+    store.put('session-1234', {'v': 1})
+    parent = store._db
+
+    # As seen from a forked worker
+    monkeypatch.setattr(sessions.os, 'getpid', lambda: -1)
+    assert store.get('session-1234') == {'v': 1}
+    assert store._db is not parent
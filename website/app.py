@@ -1,18 +1,16 @@
 from flask import Flask, render_template, request, jsonify
-import json
+import os
 import sys
-sys.path.append('../agent')
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'agent'))
+from car_catalog import get_catalog
 from car_agent import CarAgent
 
 app = Flask(__name__)
+catalog = get_catalog()
 agent = CarAgent()
 
 def load_cars():
-    try:
-        with open('../data/cars.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return []
+    return catalog.cars
 
 @app.route('/')
 def index():